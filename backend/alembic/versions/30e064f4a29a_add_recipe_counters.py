@@ -0,0 +1,33 @@
+"""Add denormalized likes_count and comments_count to recipes
+
+Revision ID: 30e064f4a29a
+Revises: a4fa05f5a666
+Create Date: 2026-10-17 11:24:37.106254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '30e064f4a29a'
+down_revision = 'a4fa05f5a666'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('recipes', sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('recipes', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill counters from existing rows
+    op.execute(
+        "UPDATE recipes SET "
+        "likes_count = (SELECT COUNT(*) FROM likes WHERE likes.recipe_id = recipes.id), "
+        "comments_count = (SELECT COUNT(*) FROM comments WHERE comments.recipe_id = recipes.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('recipes', 'comments_count')
+    op.drop_column('recipes', 'likes_count')
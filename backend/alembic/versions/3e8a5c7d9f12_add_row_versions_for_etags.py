@@ -0,0 +1,28 @@
+"""Add version columns to users, recipes and comments for ETags
+
+Revision ID: 3e8a5c7d9f12
+Revises: 9b4d6e2a1c73
+Create Date: 2026-10-18 10:12:44.381205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8a5c7d9f12'
+down_revision = '9b4d6e2a1c73'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'recipes', 'comments')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'version')
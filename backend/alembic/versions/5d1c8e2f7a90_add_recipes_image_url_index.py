@@ -0,0 +1,24 @@
+"""Add recipes image_url index for upload reference counting
+
+Revision ID: 5d1c8e2f7a90
+Revises: b8f73056ba73
+Create Date: 2026-10-17 16:22:47.180355
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1c8e2f7a90'
+down_revision = 'b8f73056ba73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_recipes_image_url', 'recipes', ['image_url'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_image_url', table_name='recipes')
@@ -0,0 +1,66 @@
+"""Store recipe ingredients and steps as JSON (JSONB on PostgreSQL)
+
+Revision ID: 7e3b9c41d2a6
+Revises: 5d1c8e2f7a90
+Create Date: 2026-10-17 18:05:31.642019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3b9c41d2a6'
+down_revision = '5d1c8e2f7a90'
+branch_labels = None
+depends_on = None
+
+TEXT_SEARCH_VECTOR_DDL = [
+    "ALTER TABLE recipes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(ingredients, '')), 'C')) STORED",
+    "CREATE INDEX ix_recipes_search_vector ON recipes USING GIN (search_vector)",
+]
+
+JSONB_SEARCH_VECTOR_DDL = [
+    "ALTER TABLE recipes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('russian', ingredients, '[\"string\"]'), 'C')) STORED",
+    "CREATE INDEX ix_recipes_search_vector ON recipes USING GIN (search_vector)",
+]
+
+
+def _alter_columns(type_, existing_type, cast: str) -> None:
+    for name in ('ingredients', 'steps'):
+        op.alter_column(
+            'recipes', name, type_=type_, existing_type=existing_type,
+            existing_nullable=False, postgresql_using=f'{name}::{cast}',
+        )
+
+
+def upgrade() -> None:
+    # SQLite keeps JSON as text, and the existing rows already hold JSON text
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # A column used by a generated column cannot change type, so the search vector is rebuilt
+    op.drop_column('recipes', 'search_vector')
+    _alter_columns(postgresql.JSONB(), sa.Text(), 'jsonb')
+    for statement in JSONB_SEARCH_VECTOR_DDL:
+        op.execute(statement)
+    op.create_index(
+        'ix_recipes_ingredients', 'recipes', ['ingredients'],
+        postgresql_using='gin', postgresql_ops={'ingredients': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_recipes_ingredients', table_name='recipes')
+    op.drop_column('recipes', 'search_vector')
+    _alter_columns(sa.Text(), postgresql.JSONB(), 'text')
+    for statement in TEXT_SEARCH_VECTOR_DDL:
+        op.execute(statement)
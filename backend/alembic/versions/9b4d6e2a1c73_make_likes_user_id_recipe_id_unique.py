@@ -0,0 +1,35 @@
+"""Make likes (user_id, recipe_id) unique
+
+Revision ID: 9b4d6e2a1c73
+Revises: f7c0a3e5d184
+Create Date: 2026-10-17 21:34:18.204615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4d6e2a1c73'
+down_revision = 'f7c0a3e5d184'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the earliest of any duplicate likes, then bring the counters back in line
+    op.execute(
+        "DELETE FROM likes WHERE id NOT IN "
+        "(SELECT MIN(id) FROM likes GROUP BY user_id, recipe_id)"
+    )
+    op.execute(
+        "UPDATE recipes SET likes_count = "
+        "(SELECT COUNT(*) FROM likes WHERE likes.recipe_id = recipes.id)"
+    )
+    op.drop_index('ix_likes_user_id_recipe_id', table_name='likes')
+    op.create_index('ix_likes_user_id_recipe_id', 'likes', ['user_id', 'recipe_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_likes_user_id_recipe_id', table_name='likes')
+    op.create_index('ix_likes_user_id_recipe_id', 'likes', ['user_id', 'recipe_id'], unique=False)
@@ -0,0 +1,24 @@
+"""Add recipes (created_at, id) index for keyset pagination
+
+Revision ID: a4fa05f5a666
+Revises: 3831c2261ae8
+Create Date: 2026-10-17 10:02:11.418903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4fa05f5a666'
+down_revision = '3831c2261ae8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_recipes_created_at_id', 'recipes', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_created_at_id', table_name='recipes')
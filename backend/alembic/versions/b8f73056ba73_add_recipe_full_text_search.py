@@ -0,0 +1,91 @@
+"""Add full-text search index for recipes
+
+Revision ID: b8f73056ba73
+Revises: 30e064f4a29a
+Create Date: 2026-10-17 12:41:09.553172
+
+"""
+import json
+import re
+
+from alembic import op
+import snowballstemmer
+import sqlalchemy as sa
+
+# ingredients was still JSON text at this revision, see 7e3b9c41d2a6 for the jsonb version
+POSTGRES_DDL = [
+    "ALTER TABLE recipes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(ingredients, '')), 'C')) STORED",
+    "CREATE INDEX ix_recipes_search_vector ON recipes USING GIN (search_vector)",
+]
+
+# The FTS5 table and the stemming that fills it, as they were at this revision
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+    "title, description, ingredients, tokenize='unicode61 remove_diacritics 2')",
+]
+WORD_RE = re.compile(r"\w+")
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f73056ba73'
+down_revision = '30e064f4a29a'
+branch_labels = None
+depends_on = None
+
+
+def _stems(value) -> str:
+    if not value:
+        return ""
+    words = WORD_RE.findall(value.lower().replace("ё", "е"))
+    return " ".join(snowballstemmer.stemmer("russian").stemWords(words))
+
+
+def _ingredients_text(ingredients) -> str:
+    try:
+        return " ".join(str(item) for item in json.loads(ingredients or "[]"))
+    except json.JSONDecodeError:
+        return ingredients
+
+
+def rebuild_sqlite_index(bind) -> None:
+    rows = bind.execute(sa.text("SELECT id, title, description, ingredients FROM recipes")).all()
+    if rows:
+        bind.execute(
+            sa.text(
+                "INSERT INTO recipes_fts (rowid, title, description, ingredients) "
+                "VALUES (:rowid, :title, :description, :ingredients)"
+            ),
+            [
+                {
+                    "rowid": row.id,
+                    "title": _stems(row.title),
+                    "description": _stems(row.description),
+                    "ingredients": _stems(_ingredients_text(row.ingredients)),
+                }
+                for row in rows
+            ],
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # search_vector is a generated column, so existing rows are indexed immediately
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        rebuild_sqlite_index(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_recipes_search_vector', table_name='recipes')
+        op.drop_column('recipes', 'search_vector')
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS recipes_fts')
@@ -0,0 +1,24 @@
+"""Add likes (user_id, recipe_id) index for bulk like status
+
+Revision ID: c2a7e9f14b38
+Revises: 7e3b9c41d2a6
+Create Date: 2026-10-17 19:12:05.318847
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a7e9f14b38'
+down_revision = '7e3b9c41d2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_likes_user_id_recipe_id', 'likes', ['user_id', 'recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_likes_user_id_recipe_id', table_name='likes')
@@ -0,0 +1,24 @@
+"""Add recipes (author_id, created_at, id) index for author listings
+
+Revision ID: e41f6d2b9a57
+Revises: c2a7e9f14b38
+Create Date: 2026-10-17 20:03:44.905126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41f6d2b9a57'
+down_revision = 'c2a7e9f14b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_recipes_author_id_created_at_id', 'recipes', ['author_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_author_id_created_at_id', table_name='recipes')
@@ -0,0 +1,24 @@
+"""Add likes (user_id, created_at, id) index for favorites listing
+
+Revision ID: f7c0a3e5d184
+Revises: e41f6d2b9a57
+Create Date: 2026-10-17 20:47:12.550391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c0a3e5d184'
+down_revision = 'e41f6d2b9a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_likes_user_id_created_at_id', 'likes', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_likes_user_id_created_at_id', table_name='likes')
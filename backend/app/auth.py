@@ -1,10 +1,19 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import jwt as pyjwt
+from sqlalchemy import event
 from app.config import settings
+from app.cache import TTLCache
+from app.commit_hooks import after_commit
+from app.models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost than bcrypt_rounds are upgraded on the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
@@ -14,6 +23,90 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class HasherBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so a few threads keep hashing off the event loop and off
+    the shared request threadpool. At most max_queue operations may wait for a thread;
+    beyond that callers get HasherBusy instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queued = 0
+        self.wait_total = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash when the stored one uses outdated settings"""
+        return await self._run(pwd_context.verify_and_update, password, hashed_password)
+
+    async def _run(self, function, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HasherBusy()
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        submitted = time.perf_counter()
+        future = self._executor.submit(self._call, submitted, function, *args)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, submitted: float, function, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_total += time.perf_counter() - submitted
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "workers": self.workers,
+                "rounds": pwd_context.handler("bcrypt").default_rounds,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "max_queued": self.max_queued,
+                "queue_wait_avg_ms": 1000 * self.wait_total / started if started else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
+
+
+# schemas.User snapshots of authenticated users, keyed by user id
+principal_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    # Deactivation, renames and deletions must not be served from the cache after commit
+    after_commit(target, principal_cache.delete, target.id)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -24,4 +117,3 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = pyjwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
-
@@ -0,0 +1,22 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+PENDING_KEY = "after_commit"
+
+
+def after_commit(target, operation, *args):
+    """Run operation(*args) once the session owning target commits; it is dropped on rollback"""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, []).append((operation, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    for operation, args in session.info.pop(PENDING_KEY, []):
+        operation(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(PENDING_KEY, None)
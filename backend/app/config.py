@@ -10,6 +10,40 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     upload_dir: str = "uploads"
     max_file_size: int = 5242880  # 5MB
+    max_form_fields_size: int = 1048576  # 1MB for the other fields of an upload form
+    image_workers: int = 2  # processes for image validation and resizing
+    # Unreferenced uploads are deleted once older than the grace period; 0 disables the periodic run
+    upload_gc_interval: int = 21600  # seconds
+    upload_gc_grace: int = 3600  # seconds
+    # Serve "name.br"/"name.gz" next to an upload to clients that accept them
+    uploads_precompressed: bool = False
+    # On-demand resized images (/img); keep it outside upload_dir
+    image_cache_dir: str = "image_cache"
+    image_cache_max_bytes: int = 536870912  # 512MB
+    # Response compression (gzip, and Brotli when installed); smaller bodies are sent as is
+    compression_minimum_size: int = 1024  # bytes
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    # Password hashing: bcrypt cost factor and the dedicated pool that computes it
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 64
+    # Connection pool, shared by the sync and async engines (each gets its own pool)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_pre_ping: bool = True
+    # SQLite pragmas applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256MB
+    sqlite_busy_timeout: int = 5000  # milliseconds
+    # Authenticated users are cached by id; a change on another worker shows up after the TTL
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 30  # seconds
+    reference_cache_size: int = 256
+    reference_cache_ttl: int = 300  # seconds
     
     class Config:
         env_file = ".env"
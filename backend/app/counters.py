@@ -0,0 +1,87 @@
+from sqlalchemy import Integer, delete, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .models import Recipe, Like, Comment
+
+
+def _adjust(column, recipe_id: int, delta: int):
+    return (
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values({column: column + delta})
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def adjust_likes_count(db: AsyncSession, recipe_id: int, delta: int):
+    """Atomically add delta to a recipe's likes counter in the current transaction"""
+    await db.execute(_adjust(Recipe.likes_count, recipe_id, delta))
+
+
+async def adjust_comments_count(db: AsyncSession, recipe_id: int, delta: int):
+    """Atomically add delta to a recipe's comments counter in the current transaction"""
+    await db.execute(_adjust(Recipe.comments_count, recipe_id, delta))
+
+
+async def add_like(db: AsyncSession, user_id: int, recipe_id: int) -> bool:
+    """Like a recipe in one INSERT ... ON CONFLICT DO NOTHING; False if already liked or no such recipe"""
+    likes = Like.__table__
+    # Selecting from recipes makes the insert a no-op for a missing recipe
+    # without a separate existence check
+    recipe = select(literal(user_id, Integer), Recipe.id).where(Recipe.id == recipe_id)
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = (
+        dialect.insert(likes)
+        .from_select(["user_id", "recipe_id"], recipe)
+        .on_conflict_do_nothing(index_elements=["user_id", "recipe_id"])
+        .returning(likes.c.id)
+    )
+    added = (await db.execute(statement)).first() is not None
+    if added:
+        await adjust_likes_count(db, recipe_id, 1)
+    return added
+
+
+async def remove_like(db: AsyncSession, user_id: int, recipe_id: int) -> bool:
+    """Unlike a recipe in one DELETE ... RETURNING; False if it was not liked"""
+    likes = Like.__table__
+    statement = (
+        delete(likes)
+        .where(likes.c.user_id == user_id, likes.c.recipe_id == recipe_id)
+        .returning(likes.c.id)
+    )
+    removed = (await db.execute(statement)).first() is not None
+    if removed:
+        await adjust_likes_count(db, recipe_id, -1)
+    return removed
+
+
+def reconcile_counters(db: Session) -> int:
+    """Recompute likes_count and comments_count from the likes and comments tables.
+
+    Returns the number of recipes whose counters were out of date.
+    """
+    likes = (
+        select(func.count(Like.id)).where(Like.recipe_id == Recipe.id).correlate(Recipe).scalar_subquery()
+    )
+    comments = (
+        select(func.count(Comment.id)).where(Comment.recipe_id == Recipe.id).correlate(Recipe).scalar_subquery()
+    )
+    fixed = db.query(Recipe).filter(
+        (Recipe.likes_count != likes) | (Recipe.comments_count != comments)
+    ).update(
+        {Recipe.likes_count: likes, Recipe.comments_count: comments}, synchronize_session=False
+    )
+    db.commit()
+    return fixed
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Reconciled counters for {reconcile_counters(db)} recipes")
+    finally:
+        db.close()
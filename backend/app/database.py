@@ -1,18 +1,159 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+import orjson
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+# asyncio drivers for the same databases the synchronous engine talks to
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str):
+    """The given database URL with its driver swapped for the asyncio one"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+class PoolMetrics:
+    """Counters for one engine's pool: checkouts, time spent waiting for a connection,
+    checkouts that had to open an overflow connection and checkouts that timed out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, opened_overflow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_checkouts += opened_overflow
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": 1000 * self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "wait_max_ms": 1000 * self.wait_max,
+            }
+        # Live gauges exist only on queue pools
+        for gauge in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, gauge):
+                stats[gauge] = getattr(pool, gauge)()
+        return stats
+
+
+def metered_pool(pool_class, metrics: PoolMetrics):
+    """Subclass of pool_class that reports every checkout to metrics.
+
+    The wait covers the whole checkout, including opening a new connection when the
+    pool has none idle; it is what a request actually spends before its first query.
+    """
+    class MeteredPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            overflow = self.overflow()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            # Only a checkout that grew the overflow past the pool size opened an overflow
+            # connection; others reused an idle one while overflow connections were out
+            metrics.record(time.perf_counter() - started, self.overflow() > max(overflow, 0))
+            return connection
+
+    MeteredPool.__name__ = f"Metered{pool_class.__name__}"
+    return MeteredPool
+
+
+def dump_json(value) -> str:
+    # Unlike json.dumps' default, keeps Cyrillic as UTF-8 rather than \u escapes
+    return orjson.dumps(value).decode()
+
+
+def engine_options(url, pool_class, metrics: PoolMetrics) -> dict:
+    """create_engine keyword arguments for url: a metered pool sized from settings"""
+    url = make_url(url)
+    # Used for the JSON/JSONB columns (recipe ingredients and steps)
+    options = {"json_serializer": dump_json, "json_deserializer": orjson.loads}
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # An in-memory database lives in its single connection; keep the dialect's pool
+            return options
+        options["connect_args"] = {"check_same_thread": False}
+    options.update(
+        poolclass=metered_pool(pool_class, metrics),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer; busy_timeout makes a second writer
+    # wait for the lock instead of failing with "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+    cursor.close()
+
+
+def configure_sqlite(engine):
+    """Apply the SQLite pragma profile to every connection engine opens"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+
+
+pool_metrics = PoolMetrics()
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, QueuePool, pool_metrics))
+configure_sqlite(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Routes on the hot request path run on the event loop and use this engine instead
+async_database = async_database_url(settings.database_url)
+async_pool_metrics = PoolMetrics()
+async_engine = create_async_engine(
+    async_database, **engine_options(async_database, AsyncAdaptedQueuePool, async_pool_metrics)
+)
+configure_sqlite(async_engine)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
+def pool_stats() -> dict:
+    return {
+        "sync": pool_metrics.stats(engine.pool),
+        "async": async_pool_metrics.stats(async_engine.pool),
+    }
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -20,3 +161,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
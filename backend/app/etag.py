@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Clients may keep the response but must revalidate it with If-None-Match each time
+CACHE_CONTROL = "no-cache"
+# For content that never changes under the same URL (uploads and their renderings)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_etag(*version) -> str:
+    """Build a strong ETag from the values that identify a version of a resource"""
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against etag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a client whose copy is still current"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str):
+    """Attach the ETag and revalidation policy to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
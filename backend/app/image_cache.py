@@ -0,0 +1,147 @@
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict
+
+from .config import settings
+from .images import VARIANT_FORMATS, resize_image, run_in_process
+
+# Requested widths are rounded up to one of these, so a client cannot fill the cache
+# with one rendering per pixel width
+IMAGE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1600, 1920)
+
+
+def snap_width(width: int) -> int:
+    return next((allowed for allowed in IMAGE_WIDTHS if allowed >= width), IMAGE_WIDTHS[-1])
+
+
+class ImageCache:
+    """Size-capped on-disk LRU cache of resized uploads.
+
+    Each rendering is stored as a file named after the source, width and format. The
+    least recently served files are deleted once the directory grows past max_bytes.
+    Concurrent requests for a rendering that is not cached yet share a single render.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._clear()
+
+    def _clear(self):
+        self._loaded = False
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def reset(self):
+        """Forget the index and counters; the directory is rescanned on next use"""
+        with self._lock:
+            self._clear()
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith((".part", ".tmp")):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        with self._lock:
+            if self._loaded:
+                return
+            # Files touched most recently were served most recently
+            for _, name, size in sorted(found):
+                self._entries[name] = size
+                self._size += size
+            self._loaded = True
+
+    async def get(self, source: str, width: int, image_format: str) -> str:
+        """Path of source resized to width in image_format, rendering it on first request"""
+        self.ensure_loaded()
+        stem = os.path.splitext(os.path.basename(source))[0]
+        key = f"{stem}_w{width}{VARIANT_FORMATS[image_format][0]}"
+        path = os.path.join(self.directory, key)
+        if self._touch(key, path):
+            return path
+
+        render = self._inflight.get(key)
+        if render is None:
+            with self._lock:
+                self.misses += 1
+            render = self._inflight[key] = asyncio.ensure_future(self._render(source, key, width, image_format))
+            render.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            with self._lock:
+                self.coalesced += 1
+        # A client that disconnects must not cancel the render others are waiting for
+        return await asyncio.shield(render)
+
+    def _touch(self, key: str, path: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+        try:
+            # mtime keeps the LRU order across restarts
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker sharing the directory
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return False
+        with self._lock:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return True
+
+    async def _render(self, source: str, key: str, width: int, image_format: str) -> str:
+        path = os.path.join(self.directory, key)
+        # Unique per render: workers sharing the directory may render the same key at once
+        partial = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            await run_in_process(resize_image, source, partial, width, image_format)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._add(key, os.path.getsize(path))
+        return path
+
+    def _add(self, key: str, size: int):
+        evicted = []
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                name, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self.evictions += 1
+                evicted.append(name)
+        for name in evicted:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "rendering": len(self._inflight),
+            }
+
+
+image_cache = ImageCache(settings.image_cache_dir, settings.image_cache_max_bytes)
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Accepted image formats and the extension stored files get
+ALLOWED_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+CHUNK_SIZE = 64 * 1024
+
+# Resized copies made for every upload: variant -> longest side in pixels.
+# Sizes cover the rendered width on 2x screens (cards are ~320px wide, the detail page ~800px)
+VARIANTS = {"thumb": 200, "card": 640, "full": 1600}
+VARIANT_FORMATS = {
+    "jpeg": (".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": (".webp", {"quality": 80, "method": 4}),
+}
+VARIANT_RE = re.compile(r"_(%s)\.(jpg|webp)$" % "|".join(VARIANTS))
+UPLOADS_PREFIX = "/uploads/"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def image_executor() -> ProcessPoolExecutor:
+    """Process pool for Pillow work, created on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.image_workers)
+    return _executor
+
+
+async def run_in_process(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(image_executor(), function, *args)
+
+
+def inspect_image(path: str) -> Optional[str]:
+    """Format of the image at path, or None if it is not an intact image of an allowed format.
+
+    Runs in a worker process: decoding untrusted files stays out of the web worker.
+    """
+    try:
+        with Image.open(path) as image:
+            image.verify()
+            return image.format if image.format in ALLOWED_FORMATS else None
+    except Exception:
+        return None
+
+
+async def save_upload(file: UploadFile) -> str:
+    """Stream an uploaded image to the upload directory and return its filename.
+
+    Files are named by the SHA-256 of their content, so uploading the same image again
+    reuses the stored copy. Writing stops with 413 as soon as the file grows past
+    max_file_size; a file that is not a valid image is rejected with 400. Nothing is
+    left on disk in either case.
+    """
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    partial = os.path.join(settings.upload_dir, f".{uuid.uuid4()}.part")
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        async with aiofiles.open(partial, "wb") as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise HTTPException(
+                        status_code=413, detail=f"Image is larger than {settings.max_file_size} bytes"
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+
+        image_format = await run_in_process(inspect_image, partial)
+        if image_format is None:
+            raise HTTPException(status_code=400, detail="File is not a supported image")
+
+        filename = f"{digest.hexdigest()}{ALLOWED_FORMATS[image_format]}"
+        path = os.path.join(settings.upload_dir, filename)
+        if await aiofiles.os.path.exists(path):
+            # Already stored; a fresh mtime keeps the garbage collector's grace period
+            # from removing it before the recipe that now uses it is committed
+            os.utime(path)
+        else:
+            await aiofiles.os.replace(partial, path)
+        return filename
+    finally:
+        if await aiofiles.os.path.exists(partial):
+            await aiofiles.os.remove(partial)
+
+
+def variant_filename(filename: str, variant: str, image_format: str) -> str:
+    return f"{os.path.splitext(filename)[0]}_{variant}{VARIANT_FORMATS[image_format][0]}"
+
+
+def variant_paths(filename: str) -> List[str]:
+    """Paths of every variant of an upload in the upload directory"""
+    return [
+        os.path.join(settings.upload_dir, variant_filename(filename, variant, image_format))
+        for variant in VARIANTS
+        for image_format in VARIANT_FORMATS
+    ]
+
+
+def image_variants(image_url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """URLs of the resized copies of an uploaded image, by variant and format.
+
+    The names follow from the upload's name; right after an upload the files may still
+    be rendering, so clients should fall back to image_url when one fails to load.
+    """
+    if not image_url or not image_url.startswith(UPLOADS_PREFIX):
+        return None
+    stem = UPLOADS_PREFIX + os.path.splitext(image_url[len(UPLOADS_PREFIX):])[0]
+    return {
+        variant: {
+            image_format: f"{stem}_{variant}{extension}"
+            for image_format, (extension, _) in VARIANT_FORMATS.items()
+        }
+        for variant in VARIANTS
+    }
+
+
+def _save(image: Image.Image, target: str, image_format: str):
+    keeps_alpha = image_format == "webp" and image.mode in ("RGBA", "LA", "P")
+    converted = image.convert("RGBA" if keeps_alpha else "RGB")
+    # Written under a temporary name so a half-written file is never served
+    converted.save(target + ".part", format=image_format.upper(), **VARIANT_FORMATS[image_format][1])
+    os.replace(target + ".part", target)
+
+
+def render_variants(path: str) -> List[str]:
+    """Write every variant of the image at path next to it; runs in a worker process"""
+    directory, filename = os.path.split(path)
+    written = []
+    with Image.open(path) as original:
+        # Phone photos are stored sideways with an EXIF orientation tag
+        original = ImageOps.exif_transpose(original)
+        for variant, size in VARIANTS.items():
+            image = original.copy()
+            image.thumbnail((size, size), Image.LANCZOS)
+            for image_format in VARIANT_FORMATS:
+                target = os.path.join(directory, variant_filename(filename, variant, image_format))
+                _save(image, target, image_format)
+                written.append(target)
+    return written
+
+
+def resize_image(source: str, target: str, width: int, image_format: str):
+    """Write source scaled down to width (never up) to target; runs in a worker process"""
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        _save(image, target, image_format)
+
+
+async def generate_variants(filename: str):
+    """Render the variants of an uploaded image in the process pool; meant for BackgroundTasks"""
+    if all(os.path.exists(path) for path in variant_paths(filename)):
+        # A re-upload of an image that is already stored
+        return
+    try:
+        await run_in_process(render_variants, os.path.join(settings.upload_dir, filename))
+    except Exception:
+        logger.exception("Could not render variants of %s", filename)
+
+
+def backfill_variants() -> int:
+    """Render variants for uploads that have none yet; returns how many images were processed"""
+    pending = [
+        os.path.join(settings.upload_dir, filename)
+        for filename in sorted(os.listdir(settings.upload_dir))
+        if not filename.startswith(".")
+        and not VARIANT_RE.search(filename)
+        and not os.path.exists(os.path.join(settings.upload_dir, variant_filename(filename, "full", "webp")))
+    ]
+    for path, _ in zip(pending, image_executor().map(render_variants, pending)):
+        logger.info("Rendered variants of %s", path)
+    return len(pending)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Rendered variants for {backfill_variants()} images")
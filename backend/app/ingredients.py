@@ -0,0 +1,202 @@
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .commit_hooks import after_commit
+from .models import Recipe
+from .search import WORD_RE, stem_words
+
+# Free-text ingredient lines look like "500г говядины на кости" or "Соль, перец по вкусу"
+SPLIT_RE = re.compile(r"[,;]|\s+и\s+|\s+или\s+")
+OPTIONAL_RE = re.compile(r"\b(по вкусу|по желанию|для подачи|для украшения)\b")
+UNIT_STEMS = set(stem_words(
+    "г гр грамм кг килограмм мг мл л литр ст ч ст л ч л шт штука уп упаковка банка "
+    "стакан чашка пучок щепотка зубчик долька ломтик кусок головка горсть капля"
+))
+STOP_STEMS = set(stem_words("на с со в во для по из без от к до о"))
+# Snowball keeps derivational suffixes ("картофел" vs "картофелин"), so terms are cut
+# to a common prefix to put such word families together
+TERM_LENGTH = 6
+
+
+class ParsedIngredient(NamedTuple):
+    name: str
+    terms: FrozenSet[str]
+    optional: bool
+
+
+def _strip_quantity(words: List[str]) -> List[str]:
+    while words and (any(ch.isnumeric() for ch in words[0]) or stem_words(words[0])[0] in UNIT_STEMS):
+        words = words[1:]
+    return words
+
+
+def parse_ingredient(line: str) -> List[ParsedIngredient]:
+    """Split an ingredient line into normalized ingredients with their stemmed terms"""
+    text = line.lower().replace("ё", "е")
+    optional = bool(OPTIONAL_RE.search(text))
+    text = OPTIONAL_RE.sub(" ", text)
+
+    parsed = []
+    for part in SPLIT_RE.split(text):
+        words = _strip_quantity(WORD_RE.findall(part))
+        if not words:
+            continue
+        terms = frozenset(stem[:TERM_LENGTH] for stem in stem_words(" ".join(words)) if stem not in STOP_STEMS)
+        if terms:
+            parsed.append(ParsedIngredient(" ".join(words), terms, optional))
+    return parsed
+
+
+def ingredient_names(line: str) -> List[str]:
+    """Ingredient names in a line without quantities, e.g. "500г говядины" -> ["говядины"]"""
+    return [ingredient.name for ingredient in parse_ingredient(line)]
+
+
+def ingredient_terms(values: Iterable[str]) -> Set[str]:
+    """Stemmed terms for the ingredients a user has at hand"""
+    terms = set()
+    for value in values:
+        for ingredient in parse_ingredient(value):
+            terms |= ingredient.terms
+    return terms
+
+
+def _ingredient_lines(ingredients) -> list:
+    if isinstance(ingredients, str):
+        try:
+            ingredients = json.loads(ingredients)
+        except json.JSONDecodeError:
+            return []
+    return [str(line) for line in ingredients or []]
+
+
+class IngredientIndex:
+    """Inverted index from ingredient terms to the recipes that use them.
+
+    Each recipe's ingredient lines are parsed once; matching a pantry only touches
+    the posting sets of the given terms, never the other recipes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._loaded = False
+        # Changes committed while the initial load runs, replayed on top of its snapshot
+        self._pending: Optional[List[tuple]] = None
+        self._postings: Dict[str, Set[Tuple[int, int]]] = defaultdict(set)
+        self._recipes: Dict[int, List[ParsedIngredient]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self):
+        """Drop everything; the index reloads from the database on next use"""
+        with self._lock:
+            self._clear()
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # From here on commits are buffered, so none is lost between the snapshot and the load
+            if self._pending is None:
+                self._pending = []
+        recipes = db.query(Recipe.id, Recipe.ingredients).all()
+        with self._lock:
+            # Already loaded by another caller, or reset while this snapshot was read
+            if self._loaded or self._pending is None:
+                return
+            for recipe in recipes:
+                self._set_recipe(recipe.id, recipe.ingredients)
+            for operation, args in self._pending:
+                operation(*args)
+            self._pending = None
+            self._loaded = True
+
+    def committed(self, operation, *args):
+        """Apply a committed change: at once when loaded, after the snapshot while a load runs"""
+        with self._lock:
+            if self._loaded:
+                operation(*args)
+            elif self._pending is not None:
+                self._pending.append((operation, args))
+
+    def set_recipe(self, recipe_id: int, ingredients):
+        with self._lock:
+            self._set_recipe(recipe_id, ingredients)
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_recipe(recipe_id)
+
+    def match(self, available: Iterable[str], limit: int = 20) -> List[dict]:
+        """Rank recipes by the share of their required ingredients covered by available"""
+        terms = ingredient_terms(available)
+        with self._lock:
+            covered: Dict[int, Set[int]] = defaultdict(set)
+            for term in terms:
+                for recipe_id, position in self._postings.get(term, ()):
+                    covered[recipe_id].add(position)
+
+            matches = []
+            for recipe_id, positions in covered.items():
+                parsed = self._recipes[recipe_id]
+                required = [i for i, ingredient in enumerate(parsed) if not ingredient.optional]
+                have = [i for i in required if i in positions]
+                if required and not have:
+                    continue
+                missing = [parsed[i].name for i in required if i not in positions]
+                matches.append({
+                    "recipe_id": recipe_id,
+                    "coverage": len(have) / len(required) if required else 1.0,
+                    "matched": [parsed[i].name for i in sorted(positions)],
+                    "missing": missing,
+                })
+
+        matches.sort(key=lambda match: (-match["coverage"], len(match["missing"]), -match["recipe_id"]))
+        return matches[:limit]
+
+    def _set_recipe(self, recipe_id: int, ingredients):
+        self._remove_recipe(recipe_id)
+        parsed = [ingredient for line in _ingredient_lines(ingredients) for ingredient in parse_ingredient(line)]
+        for position, ingredient in enumerate(parsed):
+            for term in ingredient.terms:
+                self._postings[term].add((recipe_id, position))
+        self._recipes[recipe_id] = parsed
+
+    def _remove_recipe(self, recipe_id: int):
+        for position, ingredient in enumerate(self._recipes.pop(recipe_id, [])):
+            for term in ingredient.terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                postings.discard((recipe_id, position))
+                if not postings:
+                    del self._postings[term]
+
+
+ingredient_index = IngredientIndex()
+
+
+# The index decides at commit time: apply now, buffer behind a running load, or skip
+# because the load has yet to start and its snapshot will include the change
+@event.listens_for(Recipe, "after_insert")
+@event.listens_for(Recipe, "after_update")
+def _recipe_saved(mapper, connection, target):
+    after_commit(target, ingredient_index.committed, ingredient_index._set_recipe, target.id, target.ingredients)
+
+
+@event.listens_for(Recipe, "after_delete")
+def _recipe_deleted(mapper, connection, target):
+    after_commit(target, ingredient_index.committed, ingredient_index._remove_recipe, target.id)
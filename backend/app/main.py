@@ -1,17 +1,50 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
-from .routers import auth, users, recipes, comments, likes, categories
+from .routers import auth, users, recipes, comments, likes, categories, search, images
 from .config import settings
+from .pagination import NEXT_CURSOR_HEADER
+from .cache import reference_cache
+from .database import pool_stats
+from .auth import password_hasher
+from .middleware import CompressionMiddleware, UploadSizeLimitMiddleware
+from .image_cache import image_cache
+from .uploads import upload_gc_loop
+from .static import UploadFiles
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    gc_task = asyncio.create_task(upload_gc_loop()) if settings.upload_gc_interval else None
+    yield
+    if gc_task:
+        gc_task.cancel()
+
 
 app = FastAPI(
     title="Cookbook API",
     description="API для платформы обмена кулинарными рецептами",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Refuse oversized uploads before they are spooled to disk
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=settings.max_file_size + settings.max_form_fields_size,
+)
+
+# Compress JSON and other text responses for clients that accept it
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
 )
 
-# CORS middleware
+# CORS middleware (added last so it also wraps the responses of the middleware above)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -26,13 +59,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Create uploads directory
 os.makedirs(settings.upload_dir, exist_ok=True)
 
-# Static files for uploaded images
-app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
+# Uploaded images; names are content hashes, so responses are cached as immutable
+app.mount(
+    "/uploads",
+    UploadFiles(directory=settings.upload_dir, precompressed=settings.uploads_precompressed),
+    name="uploads",
+)
 
 # Include routers
 app.include_router(auth.router)
@@ -41,6 +79,8 @@ app.include_router(recipes.router)
 app.include_router(comments.router)
 app.include_router(likes.router)
 app.include_router(categories.router)
+app.include_router(search.router)
+app.include_router(images.router)
 
 
 @app.get("/")
@@ -51,3 +91,23 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    return {"reference": reference_cache.stats()}
+
+
+@app.get("/metrics/pool")
+def pool_metrics():
+    return pool_stats()
+
+
+@app.get("/metrics/password-hashing")
+def password_hashing_metrics():
+    return password_hasher.stats()
+
+
+@app.get("/metrics/image-cache")
+def image_cache_metrics():
+    return image_cache.stats()
@@ -0,0 +1,161 @@
+import zlib
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .static import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only gzip is offered
+    brotli = None
+
+# Media types worth compressing; images other than SVG are compressed already
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects multipart bodies larger than max_body_size with 413.
+
+    A declared Content-Length over the limit is refused before any of the body is read;
+    otherwise the body is counted as it arrives and the request fails once it crosses
+    the limit, instead of being spooled to disk in full first.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class CompressionMiddleware:
+    """Compresses text and JSON responses with Brotli or gzip, whichever the client accepts.
+
+    Responses smaller than minimum_size, non-text media types, responses that already
+    have a Content-Encoding (such as precompressed uploads) and partial content pass
+    through unchanged. Strong ETags are weakened on compressed responses, since the
+    bytes differ from the identity representation.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        encoding = None
+        if scope["type"] == "http":
+            encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+    @staticmethod
+    def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def compressor(self, encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """compress(chunk) and finish() functions for an encoding"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        # wbits 31 writes the gzip container rather than raw zlib
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def should_compress(self, status: int, headers: Headers) -> bool:
+        return (
+            status not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and "content-range" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        )
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compress: Optional[Callable[[bytes], bytes]] = None
+        self.finish: Optional[Callable[[], bytes]] = None
+
+    async def run(self, scope: Scope, receive: Receive):
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether compression pays off
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self.middleware.should_compress(start["status"], headers) or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compress, self.finish = self.middleware.compressor(self.encoding)
+            body = self._compress(body, more_body)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            if not more_body:
+                headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await self.send(start)
+        elif self.compress is not None:
+            body = self._compress(body, more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self.compress(body)
+        return data if more_body else data + self.finish()
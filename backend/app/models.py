@@ -1,8 +1,21 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import JSON, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, Index, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
+# Native JSON column; JSONB on PostgreSQL so its contents can be indexed and queried
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
+
+def version_column():
+    """Row version for ETags: 1 on insert and incremented by every UPDATE of the row.
+
+    Timestamps have one-second resolution on SQLite, so two edits within a second
+    would otherwise share an ETag.
+    """
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version") + 1)
+
 # Association table for recipe categories/tags
 recipe_categories = Table(
     'recipe_categories',
@@ -21,6 +34,9 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Part of the recipe and comment ETags, which embed the author
+    version = version_column()
 
     # Relationships
     recipes = relationship("Recipe", back_populates="author", cascade="all, delete-orphan")
@@ -45,41 +61,42 @@ class Recipe(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text)
-    ingredients = Column(Text, nullable=False)  # JSON string
-    steps = Column(Text, nullable=False)  # JSON string
+    ingredients = Column(JSONList, nullable=False)  # list of strings
+    steps = Column(JSONList, nullable=False)  # list of strings
     image_url = Column(String)
     prep_time = Column(Integer)  # in minutes
     cook_time = Column(Integer)  # in minutes
     servings = Column(Integer)
     difficulty = Column(String)  # easy, medium, hard
     author_id = Column(Integer, ForeignKey("users.id"))
+    # Denormalized counters, maintained by app.counters
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = version_column()
 
     # Relationships
     author = relationship("User", back_populates="recipes")
-    categories = relationship("Category", secondary=recipe_categories, back_populates="recipes")
-    comments = relationship("Comment", back_populates="recipe", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="recipe", cascade="all, delete-orphan")
-
-    @property
-    def ingredients_list(self):
-        import json
-        return json.loads(self.ingredients) if self.ingredients else []
-
-    @property
-    def steps_list(self):
-        import json
-        return json.loads(self.steps) if self.steps else []
-
-    @property
-    def likes_count(self):
-        return len(self.likes) if hasattr(self, "likes") else 0
-
-    @property
-    def comments_count(self):
-        return len(self.comments) if hasattr(self, "comments") else 0
-
+    # delete_recipe removes the related rows with set-based DELETEs, so the ORM
+    # does not load these collections just to cascade the delete
+    categories = relationship("Category", secondary=recipe_categories, back_populates="recipes", passive_deletes=True)
+    comments = relationship("Comment", back_populates="recipe", cascade="all, delete-orphan", passive_deletes=True)
+    likes = relationship("Like", back_populates="recipe", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Keyset pagination walks recipes by (created_at, id)
+        Index("ix_recipes_created_at_id", "created_at", "id"),
+        # An author's recipes, in the same keyset order (profile pages)
+        Index("ix_recipes_author_id_created_at_id", "author_id", "created_at", "id"),
+        # Uploads are shared between recipes; the garbage collector counts references by image_url
+        Index("ix_recipes_image_url", "image_url"),
+        # Containment queries inside the ingredient lists (ingredients @> '["..."]')
+        Index(
+            "ix_recipes_ingredients", "ingredients",
+            postgresql_using="gin", postgresql_ops={"ingredients": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -90,6 +107,7 @@ class Comment(Base):
     recipe_id = Column(Integer, ForeignKey("recipes.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = version_column()
 
     # Relationships
     author = relationship("User", back_populates="comments")
@@ -106,4 +124,11 @@ class Like(Base):
 
     # Relationships
     user = relationship("User", back_populates="likes")
-    recipe = relationship("Recipe", back_populates="likes")
\ No newline at end of file
+    recipe = relationship("Recipe", back_populates="likes")
+
+    __table_args__ = (
+        # One like per user and recipe; also serves like status lookups for a page of recipes
+        Index("ix_likes_user_id_recipe_id", "user_id", "recipe_id", unique=True),
+        # A user's favorites, newest first, in keyset order (GET /users/me/likes)
+        Index("ix_likes_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, String, literal, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _created_key(db: AsyncSession, created_col, created_at: datetime):
+    # SQLite keeps timestamps as text: CURRENT_TIMESTAMP server defaults store whole
+    # seconds, SQLAlchemy writes microseconds. The raw column is compared with the text
+    # the row itself would hold, so the (created_at, id) index still serves the range.
+    if db.get_bind().dialect.name == "sqlite":
+        stored = created_at.strftime("%Y-%m-%d %H:%M:%S.%f" if created_at.microsecond else "%Y-%m-%d %H:%M:%S")
+        return type_coerce(created_col, String), literal(stored, String)
+    return created_col, literal(created_at, created_col.type)
+
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    created_col,
+    id_col,
+    cursor: Optional[str],
+    limit: int,
+    skip: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """Return one page of ``statement`` ordered newest first, plus the cursor for the next page.
+
+    Rows are ordered by ``(created_col, id_col)`` descending and the cursor is compared
+    against that pair, so every page is an index range scan regardless of its depth.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        column, key = _created_key(db, created_col, created_at)
+        # A row-value comparison is a single range on the (created_at, id) index
+        statement = statement.where(tuple_(column, id_col) < tuple_(key, literal(row_id)))
+
+    statement = statement.order_by(created_col.desc(), id_col.desc())
+    if skip:
+        statement = statement.offset(skip)
+    result = await db.scalars(statement.limit(limit + 1))
+    # unique() collapses the rows joined eager loads of collections fan out into
+    rows = result.unique().all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
@@ -0,0 +1,40 @@
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, load_only
+
+from .models import Like, Recipe, User
+
+# Most recipes one request may ask about (GET /recipes/batch, GET /likes/status)
+BATCH_LIMIT = 100
+
+# Columns needed to render a recipe card (see schemas.RecipeList)
+SUMMARY_COLUMNS = (
+    Recipe.id, Recipe.title, Recipe.description, Recipe.image_url,
+    Recipe.prep_time, Recipe.cook_time, Recipe.servings, Recipe.difficulty,
+    Recipe.author_id, Recipe.likes_count, Recipe.comments_count, Recipe.created_at,
+)
+
+
+def summary_select():
+    """Select recipes with only the columns a recipe card needs"""
+    return select(Recipe).options(
+        load_only(*SUMMARY_COLUMNS),
+        joinedload(Recipe.author).load_only(User.id, User.email, User.username, User.is_active, User.created_at, User.updated_at),
+        joinedload(Recipe.categories)
+    )
+
+
+def parse_ids(values: List[str]) -> List[int]:
+    """Recipe ids from repeated and/or comma-separated ids parameters, without duplicates"""
+    try:
+        ids = [int(value) for item in values for value in item.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Recipe ids must be integers")
+    return list(dict.fromkeys(ids))
+
+
+def user_like(user_id: int, recipe_id: int):
+    """Select a user's like of a recipe"""
+    return select(Like).where(Like.user_id == user_id, Like.recipe_id == recipe_id)
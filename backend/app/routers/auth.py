@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt as pyjwt
 from pydantic import BaseModel
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User
-from ..schemas import UserCreate, UserResponse, Token
-from ..auth import verify_password, get_password_hash
+from ..schemas import User as Principal, UserCreate, UserResponse, Token
+from ..auth import HasherBusy, password_hasher, principal_cache
 from ..config import settings
 
 class LoginRequest(BaseModel):
@@ -30,13 +31,40 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = pyjwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(User).where(User.email == email))
+
+async def hash_password(method, *args):
+    """Run a password_hasher method, turning a full hashing queue into 503"""
+    try:
+        return await method(*args)
+    except HasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email(db, email=email)
+    if user:
+        verified, new_hash = await hash_password(password_hasher.verify_and_update, password, user.hashed_password)
+    if not user or not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if new_hash:
+        # The hash used another cost factor; store one made with the current settings
+        user.hashed_password = new_hash
+        await db.commit()
+    return user
 
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user already exists
-    db_user = get_user_by_email(db, email=user.email)
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -44,7 +72,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if username already exists
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await db.scalar(select(User).where(User.username == user.username))
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -52,48 +80,37 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(password_hasher.hash, user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = get_user_by_email(db, email=request.email)
-    if not user or not verify_password(request.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, request.email, request.password)
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "user_id": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login-form", response_model=Token)
-def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "user_id": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """The authenticated user as a read-only schemas.User, cached by id for a short time"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -107,11 +124,22 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except pyjwt.PyJWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
-    return user
+    user_id = payload.get("user_id")
+    principal = principal_cache.get(user_id) if user_id is not None else None
+    if principal is None:
+        if user_id is not None:
+            user = await db.get(User, user_id)
+        else:
+            # Tokens issued before user_id was added only carry the email
+            user = await get_user_by_email(db, email=email)
+        if user is None:
+            raise credentials_exception
+        principal = Principal.model_validate(user)
+        principal_cache.set(principal.id, principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
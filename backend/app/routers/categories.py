@@ -1,25 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
 from ..models import Category
 from ..schemas import CategoryResponse, CategoryCreate
+from ..etag import etag_matches, make_etag, not_modified, set_etag
+from ..cache import reference_cache
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 @router.get("/", response_model=List[CategoryResponse])
-def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_categories(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get all categories"""
-    categories = db.query(Category).offset(skip).limit(limit).all()
+    def load():
+        # Categories are only ever added, so their count and newest id identify the list
+        version = db.query(func.count(Category.id), func.max(Category.id)).one()
+        categories = db.query(Category).offset(skip).limit(limit).all()
+        return make_etag("categories", skip, limit, *version), [CategoryResponse.model_validate(c) for c in categories]
+
+    etag, categories = reference_cache.get_or_load(("categories", skip, limit), load)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return categories
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 def read_category(category_id: int, db: Session = Depends(get_db)):
     """Get a specific category"""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = reference_cache.get(("categories", "id", category_id))
     if category is None:
-        raise HTTPException(status_code=404, detail="Category not found")
+        category = db.query(Category).filter(Category.id == category_id).first()
+        if category is None:
+            raise HTTPException(status_code=404, detail="Category not found")
+        category = CategoryResponse.model_validate(category)
+        reference_cache.set(("categories", "id", category_id), category)
     return category
 
 @router.post("/", response_model=CategoryResponse)
@@ -29,5 +51,6 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    reference_cache.invalidate("categories")
     return db_category
 
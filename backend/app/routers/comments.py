@@ -1,30 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import Comment, User, Recipe
 from ..schemas import CommentCreate, CommentResponse, CommentUpdate
+from ..counters import adjust_comments_count
 from .auth import get_current_user
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
-@router.get("/recipe/{recipe_id}", response_model=List[CommentResponse])
-def read_comments_by_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    comments = db.query(Comment).filter(Comment.recipe_id == recipe_id).all()
-    return comments
+# The async session cannot lazy-load, so the author is always loaded with the comment
+comments_with_author = select(Comment).options(joinedload(Comment.author))
 
-@router.get("/{comment_id}", response_model=CommentResponse)
-def read_comment(comment_id: int, db: Session = Depends(get_db)):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+async def get_comment(db: AsyncSession, comment_id: int) -> Comment:
+    comment = await db.scalar(comments_with_author.where(Comment.id == comment_id))
     if comment is None:
         raise HTTPException(status_code=404, detail="Comment not found")
     return comment
 
+@router.get("/recipe/{recipe_id}", response_model=List[CommentResponse])
+async def read_comments_by_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db)):
+    comments = await db.scalars(comments_with_author.where(Comment.recipe_id == recipe_id))
+    return comments.all()
+
+@router.get("/{comment_id}", response_model=CommentResponse)
+async def read_comment(comment_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_comment(db, comment_id)
+
 @router.post("/", response_model=CommentResponse)
-def create_comment(comment: CommentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_comment(comment: CommentCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == comment.recipe_id).first()
+    recipe = await db.scalar(select(Recipe.id).where(Recipe.id == comment.recipe_id))
     if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
@@ -34,41 +43,38 @@ def create_comment(comment: CommentCreate, db: Session = Depends(get_db), curren
         recipe_id=comment.recipe_id
     )
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    await adjust_comments_count(db, comment.recipe_id, 1)
+    await db.commit()
+    await db.refresh(db_comment, ["author", "created_at"])
     return db_comment
 
 @router.put("/{comment_id}", response_model=CommentResponse)
-def update_comment(
+async def update_comment(
     comment_id: int, 
     comment: CommentUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if db_comment is None:
-        raise HTTPException(status_code=404, detail="Comment not found")
+    db_comment = await get_comment(db, comment_id)
     
     # Check if user is the author
     if db_comment.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     db_comment.content = comment.content
-    db.commit()
-    db.refresh(db_comment)
+    await db.commit()
+    await db.refresh(db_comment, ["content", "updated_at"])
     return db_comment
 
 @router.delete("/{comment_id}")
-def delete_comment(comment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if comment is None:
-        raise HTTPException(status_code=404, detail="Comment not found")
+async def delete_comment(comment_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    comment = await get_comment(db, comment_id)
     
     # Check if user is the author
     if comment.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await adjust_comments_count(db, comment.recipe_id, -1)
+    await db.commit()
     return {"message": "Comment deleted successfully"}
-
@@ -0,0 +1,31 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from PIL import Image
+
+from ..config import settings
+from ..etag import IMMUTABLE_CACHE_CONTROL
+from ..image_cache import image_cache, snap_width
+
+router = APIRouter(prefix="/img", tags=["images"])
+
+MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+@router.get("/{filename}")
+async def resized_image(
+    filename: str,
+    w: int = Query(..., ge=1, le=4096),
+    fmt: str = Query("webp", pattern="^(jpeg|webp)$"),
+):
+    """An uploaded image scaled down to width w (rounded up to a standard width)"""
+    source = os.path.join(settings.upload_dir, filename)
+    if filename.startswith(".") or not os.path.isfile(source):
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        path = await image_cache.get(source, snap_width(w), fmt)
+    except (OSError, Image.DecompressionBombError, Image.DecompressionBombWarning):
+        # Corrupt files, and files whose dimensions are too large to decode safely
+        raise HTTPException(status_code=400, detail="File is not a supported image")
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
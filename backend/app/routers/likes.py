@@ -1,62 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import Like, User, Recipe
+from ..counters import add_like, remove_like
+from ..queries import BATCH_LIMIT, parse_ids, user_like
+from ..schemas import LikeStatus
 from .auth import get_current_user
 
 router = APIRouter(prefix="/likes", tags=["likes"])
 
+@router.get("/status", response_model=LikeStatus)
+async def like_status(
+    ids: List[str] = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Which of the given recipes the current user has liked, for a whole page of cards at once"""
+    recipe_ids = parse_ids(ids)
+    if len(recipe_ids) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_LIMIT} recipes per request")
+    liked = set()
+    if recipe_ids:
+        liked = set(await db.scalars(
+            select(Like.recipe_id).where(Like.user_id == current_user.id, Like.recipe_id.in_(recipe_ids))
+        ))
+    return {"liked": [recipe_id for recipe_id in recipe_ids if recipe_id in liked]}
+
 @router.post("/recipe/{recipe_id}/like")
-def like_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if recipe is None:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Check if user already liked this recipe
-    existing_like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
-    
-    if existing_like:
+async def like_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    if not await add_like(db, current_user.id, recipe_id):
+        # Nothing inserted: either the like exists or the recipe does not
+        if await db.scalar(select(Recipe.id).where(Recipe.id == recipe_id)) is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
         raise HTTPException(status_code=400, detail="Recipe already liked")
-    
-    # Create new like
-    like = Like(user_id=current_user.id, recipe_id=recipe_id)
-    db.add(like)
-    db.commit()
+    await db.commit()
     
     return {"message": "Recipe liked successfully"}
 
 @router.delete("/recipe/{recipe_id}/like")
-def unlike_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # Find the like
-    like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
-    
-    if like is None:
+async def unlike_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    if not await remove_like(db, current_user.id, recipe_id):
         raise HTTPException(status_code=404, detail="Like not found")
-    
-    db.delete(like)
-    db.commit()
+    await db.commit()
     
     return {"message": "Recipe unliked successfully"}
 
 @router.get("/recipe/{recipe_id}/count")
-def get_likes_count(recipe_id: int, db: Session = Depends(get_db)):
-    count = db.query(Like).filter(Like.recipe_id == recipe_id).count()
+async def get_likes_count(recipe_id: int, db: AsyncSession = Depends(get_async_db)):
+    count = await db.scalar(select(Recipe.likes_count).where(Recipe.id == recipe_id)) or 0
     return {"recipe_id": recipe_id, "likes_count": count}
 
 @router.get("/recipe/{recipe_id}/is-liked")
-def check_if_liked(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
+async def check_if_liked(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    like = await db.scalar(user_like(current_user.id, recipe_id))
     
     return {"recipe_id": recipe_id, "is_liked": like is not None}
-
@@ -1,147 +1,268 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 import json
-import os
-import uuid
-from shutil import copyfileobj
 
-from ..database import get_db
-from ..models import Recipe, User, Category, Comment, Like
-from ..schemas import RecipeCreate, RecipeResponse, RecipeUpdate, CommentResponse
+from ..database import get_async_db
+from ..models import Recipe, User, Category, Comment, Like, recipe_categories
+from ..schemas import RecipeCreate, RecipeResponse, RecipeUpdate, RecipeList, RecipeMatch, RecipeBatch, CommentResponse
 from .auth import get_current_user
-from ..config import settings
+from ..images import generate_variants, save_upload
+from ..uploads import release_upload
+from ..pagination import NEXT_CURSOR_HEADER, paginate
+from ..queries import BATCH_LIMIT, parse_ids, summary_select, user_like
+from ..counters import add_like, remove_like
+from ..search import match_clause, ranked
+from ..ingredients import ingredient_index
+from ..etag import etag_matches, make_etag, not_modified, set_etag
+from ..serialization import batch_response, recipe_response, recipes_response, summaries_response
 
-router = APIRouter(prefix="/recipes", tags=["recipes"])
+# Recipe reads build their JSON in serialization; everything else is encoded with orjson
+router = APIRouter(prefix="/recipes", tags=["recipes"], default_response_class=ORJSONResponse)
 
-def save_uploaded_file(file: UploadFile) -> str:
-    """Save uploaded file and return the filename"""
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
+# Most recipes one listing page returns
+PAGE_LIMIT = 100
+
+def filter_recipes(db: AsyncSession, statement, category_id: Optional[int], search: Optional[str], author_id: Optional[int] = None):
+    """Apply the category, author and full-text search filters shared by the recipe listings"""
+    if author_id:
+        statement = statement.where(Recipe.author_id == author_id)
     
-    # Create uploads directory if it doesn't exist
-    os.makedirs(settings.upload_dir, exist_ok=True)
+    if category_id:
+        statement = statement.where(Recipe.categories.any(Category.id == category_id))
     
-    # Save file
-    file_path = os.path.join(settings.upload_dir, unique_filename)
-    with open(file_path, "wb") as buffer:
-        copyfileobj(file.file, buffer)
+    if search:
+        statement = statement.where(match_clause(db, search))
     
-    return unique_filename
+    return statement
+
+async def paginate_recipes(db: AsyncSession, statement, response: Response, cursor: Optional[str], limit: int, skip: int = 0):
+    """Fetch one page of recipes newest first and set the X-Next-Cursor header"""
+    try:
+        # Larger limits are clamped rather than rejected; older clients asked for more
+        recipes, next_cursor = await paginate(db, statement, Recipe.created_at, Recipe.id, cursor, min(limit, PAGE_LIMIT), skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return recipes
 
 @router.get("/", response_model=List[RecipeResponse])
-def read_recipes(
+async def read_recipes(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(PAGE_LIMIT, ge=1),
+    cursor: Optional[str] = Query(None),
     category_id: Optional[int] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    author_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Recipe).options(
+    """List recipes newest first, paged by the cursor returned in the X-Next-Cursor header"""
+    statement = select(Recipe).options(
         joinedload(Recipe.author),
-        joinedload(Recipe.categories),
-        joinedload(Recipe.comments),
-        joinedload(Recipe.likes)
+        joinedload(Recipe.categories)
     )
+    statement = filter_recipes(db, statement, category_id, search, author_id)
+    recipes = await paginate_recipes(db, statement, response, cursor, limit, skip)
+    return recipes_response(recipes, response)
+
+@router.get("/summary", response_model=List[RecipeList])
+async def read_recipe_summaries(
+    response: Response,
+    limit: int = Query(PAGE_LIMIT, ge=1),
+    cursor: Optional[str] = Query(None),
+    category_id: Optional[int] = Query(None),
+    search: Optional[str] = Query(None),
+    author_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List recipe cards without ingredients and steps, paged like GET /recipes"""
+    statement = filter_recipes(db, summary_select(), category_id, search, author_id)
+    return summaries_response(await paginate_recipes(db, statement, response, cursor, limit), response)
+
+@router.get("/search", response_model=List[RecipeList])
+async def search_recipes(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    category_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over title, description and ingredients, most relevant first"""
+    statement = filter_recipes(db, summary_select(), category_id, None)
+    result = await db.scalars(ranked(db, statement, q).offset(skip).limit(limit))
+    return summaries_response(result.unique().all(), response)
+
+@router.get("/by-ingredients", response_model=List[RecipeMatch])
+async def read_recipes_by_ingredients(
+    ingredients: List[str] = Query(...),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recipes that can be cooked from the given ingredients, best coverage first"""
+    # Only the first request after startup loads the index; the sync load runs on the session's greenlet
+    await db.run_sync(ingredient_index.ensure_loaded)
+    matches = ingredient_index.match(ingredients, limit)
     
-    if category_id:
-        query = query.filter(Recipe.categories.any(Category.id == category_id))
-    
-    if search:
-        query = query.filter(Recipe.title.contains(search))
-    
-    recipes = query.offset(skip).limit(limit).all()
-    return [RecipeResponse.from_orm(recipe) for recipe in recipes]
+    recipe_ids = [match["recipe_id"] for match in matches]
+    recipes = {}
+    if recipe_ids:
+        result = await db.scalars(summary_select().where(Recipe.id.in_(recipe_ids)))
+        recipes = {recipe.id: recipe for recipe in result.unique()}
+    return [{**match, "recipe": recipes[match["recipe_id"]]} for match in matches if match["recipe_id"] in recipes]
+
+@router.get("/batch", response_model=RecipeBatch)
+async def read_recipe_batch(
+    response: Response,
+    ids: List[str] = Query(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Several recipes by id with one query, in the requested order; unknown ids are listed in missing"""
+    recipe_ids = parse_ids(ids)
+    if len(recipe_ids) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_LIMIT} recipes per batch")
+
+    found = {}
+    if recipe_ids:
+        result = await db.scalars(
+            select(Recipe).options(
+                joinedload(Recipe.author),
+                joinedload(Recipe.categories)
+            ).where(Recipe.id.in_(recipe_ids))
+        )
+        found = {recipe.id: recipe for recipe in result.unique()}
+    recipes = [found[recipe_id] for recipe_id in recipe_ids if recipe_id in found]
+    missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in found]
+    return batch_response(recipes, missing, response)
+
+async def recipe_etag(db: AsyncSession, recipe_id: int) -> str:
+    """ETag for a recipe, from its row version and its author's, without loading relationships"""
+    version = (await db.execute(
+        select(Recipe.version, Recipe.likes_count, Recipe.comments_count, User.version)
+        .outerjoin(User, User.id == Recipe.author_id)
+        .where(Recipe.id == recipe_id)
+    )).first()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return make_etag("recipe", recipe_id, *version)
+
+async def comments_etag(db: AsyncSession, recipe_id: int) -> str:
+    """ETag for a recipe's comments; additions, edits, deletions and author changes all change it"""
+    if await db.scalar(select(Recipe.id).where(Recipe.id == recipe_id)) is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    version = (await db.execute(
+        select(
+            # Every edit raises one row's version, so the sums move on any change
+            func.count(Comment.id), func.max(Comment.id), func.sum(Comment.version), func.sum(User.version),
+        )
+        .outerjoin(User, User.id == Comment.author_id)
+        .where(Comment.recipe_id == recipe_id)
+    )).one()
+    return make_etag("comments", recipe_id, *version)
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def read_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    recipe = db.query(Recipe).options(
-        joinedload(Recipe.author),
-        joinedload(Recipe.categories),
-        joinedload(Recipe.comments),
-        joinedload(Recipe.likes)
-    ).filter(Recipe.id == recipe_id).first()
+async def read_recipe(
+    recipe_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    etag = await recipe_etag(db, recipe_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    recipe = (await db.scalars(
+        select(Recipe).options(
+            joinedload(Recipe.author),
+            joinedload(Recipe.categories)
+        ).where(Recipe.id == recipe_id)
+    )).unique().first()
     if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return RecipeResponse.from_orm(recipe)
+    set_etag(response, etag)
+    return recipe_response(recipe, response)
 
 @router.get("/{recipe_id}/comments", response_model=List[CommentResponse])
-def read_recipe_comments(recipe_id: int, db: Session = Depends(get_db)):
-    # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if recipe is None:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
+async def read_recipe_comments(
+    recipe_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Also checks that the recipe exists
+    etag = await comments_etag(db, recipe_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     # Get comments with author information
-    comments = db.query(Comment).options(
-        joinedload(Comment.author)
-    ).filter(Comment.recipe_id == recipe_id).all()
-    
-    return comments
+    comments = await db.scalars(
+        select(Comment).options(joinedload(Comment.author)).where(Comment.recipe_id == recipe_id)
+    )
+
+    set_etag(response, etag)
+    return comments.all()
 
 @router.post("/{recipe_id}/like")
-def like_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def like_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """Like or unlike a recipe"""
-    # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if recipe is None:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Check if user already liked this recipe
-    existing_like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
-    
-    if existing_like:
-        # Unlike the recipe
-        db.delete(existing_like)
-        db.commit()
+    # Unlike if there is a like to delete, otherwise like; each is a single statement
+    if await remove_like(db, current_user.id, recipe_id):
+        await db.commit()
         return {"message": "Recipe unliked successfully", "liked": False}
-    else:
-        # Like the recipe
-        like = Like(user_id=current_user.id, recipe_id=recipe_id)
-        db.add(like)
-        db.commit()
-        return {"message": "Recipe liked successfully", "liked": True}
+    if not await add_like(db, current_user.id, recipe_id):
+        # Nothing inserted: no such recipe, or a concurrent request liked it first
+        if await db.scalar(select(Recipe.id).where(Recipe.id == recipe_id)) is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+    await db.commit()
+    return {"message": "Recipe liked successfully", "liked": True}
 
 @router.get("/{recipe_id}/is-liked")
-def check_if_liked(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def check_if_liked(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """Check if current user liked this recipe"""
-    like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
+    like = await db.scalar(user_like(current_user.id, recipe_id))
     
     return {"recipe_id": recipe_id, "is_liked": like is not None}
 
 @router.delete("/{recipe_id}/like")
-def unlike_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def unlike_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """Unlike a recipe"""
-    # Check if recipe exists
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if recipe is None:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Find the like
-    like = db.query(Like).filter(
-        Like.user_id == current_user.id,
-        Like.recipe_id == recipe_id
-    ).first()
-    
-    if like is None:
+    if not await remove_like(db, current_user.id, recipe_id):
+        if await db.scalar(select(Recipe.id).where(Recipe.id == recipe_id)) is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
         # If like doesn't exist, it's already "unliked", so return success
         return {"message": "Recipe was not liked", "liked": False}
-    
-    # Remove the like
-    db.delete(like)
-    db.commit()
+    await db.commit()
     
     return {"message": "Recipe unliked successfully", "liked": False}
 
+async def load_recipe(db: AsyncSession, recipe_id: int) -> Optional[Recipe]:
+    """A recipe with everything RecipeResponse needs, refreshed from the database"""
+    return (await db.scalars(
+        select(Recipe).options(
+            joinedload(Recipe.author),
+            joinedload(Recipe.categories)
+        ).where(Recipe.id == recipe_id).execution_options(populate_existing=True)
+    )).unique().first()
+
+def parse_lines(ingredients: str, steps: str):
+    """Decode the ingredients and steps form fields, each a JSON list of strings"""
+    try:
+        lines = json.loads(ingredients), json.loads(steps)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in ingredients or steps")
+    if not all(isinstance(value, list) and all(isinstance(line, str) for line in value) for value in lines):
+        raise HTTPException(status_code=400, detail="Ingredients and steps must be lists of strings")
+    return lines
+
 @router.post("/", response_model=RecipeResponse)
-def create_recipe(
+async def create_recipe(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     ingredients: str = Form(...),
@@ -152,21 +273,16 @@ def create_recipe(
     difficulty: Optional[str] = Form(None),
     category_ids: Optional[str] = Form(None),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Parse ingredients and steps
-    try:
-        ingredients_list = json.loads(ingredients)
-        steps_list = json.loads(steps)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON in ingredients or steps")
+    ingredients_list, steps_list = parse_lines(ingredients, steps)
     
     db_recipe = Recipe(
         title=title,
         description=description,
-        ingredients=json.dumps(ingredients_list),
-        steps=json.dumps(steps_list),
+        ingredients=ingredients_list,
+        steps=steps_list,
         prep_time=prep_time,
         cook_time=cook_time,
         servings=servings,
@@ -174,40 +290,34 @@ def create_recipe(
         author_id=current_user.id
     )
     
-    # Handle image upload
-    if image:
-        try:
-            filename = save_uploaded_file(image)
-            db_recipe.image_url = f"/uploads/{filename}"
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error saving image: {str(e)}")
-    
     # Add categories if provided
     if category_ids:
         try:
             category_id_list = json.loads(category_ids)
-            categories = db.query(Category).filter(Category.id.in_(category_id_list)).all()
-            db_recipe.categories = categories
+            categories = await db.scalars(select(Category).where(Category.id.in_(category_id_list)))
+            db_recipe.categories = categories.all()
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON in category_ids")
     
+    # Handle image upload
+    if image:
+        filename = await save_upload(image)
+        db_recipe.image_url = f"/uploads/{filename}"
+        # Resized variants are rendered after the response is sent
+        background_tasks.add_task(generate_variants, filename)
+    
     db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
+    await db.commit()
     
     # Reload with relationships
-    db_recipe = db.query(Recipe).options(
-        joinedload(Recipe.author),
-        joinedload(Recipe.categories),
-        joinedload(Recipe.comments),
-        joinedload(Recipe.likes)
-    ).filter(Recipe.id == db_recipe.id).first()
+    db_recipe = await load_recipe(db, db_recipe.id)
     
     return RecipeResponse.from_orm(db_recipe)
 
 @router.put("/{recipe_id}", response_model=RecipeResponse)
-def update_recipe(
+async def update_recipe(
     recipe_id: int,
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     ingredients: str = Form(...),
@@ -218,15 +328,10 @@ def update_recipe(
     difficulty: Optional[str] = Form(None),
     category_id: Optional[int] = Form(None),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_recipe = db.query(Recipe).options(
-        joinedload(Recipe.author),
-        joinedload(Recipe.categories),
-        joinedload(Recipe.comments),
-        joinedload(Recipe.likes)
-    ).filter(Recipe.id == recipe_id).first()
+    db_recipe = await load_recipe(db, recipe_id)
     
     if db_recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
@@ -235,18 +340,13 @@ def update_recipe(
     if db_recipe.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Parse ingredients and steps
-    try:
-        ingredients_list = json.loads(ingredients)
-        steps_list = json.loads(steps)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON in ingredients or steps")
+    ingredients_list, steps_list = parse_lines(ingredients, steps)
     
     # Update fields
     db_recipe.title = title
     db_recipe.description = description
-    db_recipe.ingredients = json.dumps(ingredients_list)
-    db_recipe.steps = json.dumps(steps_list)
+    db_recipe.ingredients = ingredients_list
+    db_recipe.steps = steps_list
     
     if prep_time is not None:
         db_recipe.prep_time = prep_time
@@ -258,26 +358,35 @@ def update_recipe(
         db_recipe.difficulty = difficulty
     
     # Handle image upload
+    old_image_url = db_recipe.image_url
     if image:
-        try:
-            filename = save_uploaded_file(image)
-            db_recipe.image_url = f"/uploads/{filename}"
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error saving image: {str(e)}")
+        filename = await save_upload(image)
+        db_recipe.image_url = f"/uploads/{filename}"
+        # Resized variants are rendered after the response is sent
+        background_tasks.add_task(generate_variants, filename)
     
     # Update categories if provided
     if category_id is not None:
-        category = db.query(Category).filter(Category.id == category_id).first()
+        category = await db.get(Category, category_id)
         if category:
             db_recipe.categories = [category]
     
-    db.commit()
-    db.refresh(db_recipe)
+    # Write the row even when only categories changed, so its version (and ETag) changes too
+    db_recipe.updated_at = func.now()
+    await db.commit()
+    if db_recipe.image_url != old_image_url:
+        await release_upload(db, old_image_url, background_tasks)
+    db_recipe = await load_recipe(db, recipe_id)
     return RecipeResponse.from_orm(db_recipe)
 
 @router.delete("/{recipe_id}")
-def delete_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+async def delete_recipe(
+    recipe_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    recipe = await db.scalar(select(Recipe).where(Recipe.id == recipe_id))
     if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
@@ -285,6 +394,14 @@ def delete_recipe(recipe_id: int, db: Session = Depends(get_db), current_user: U
     if recipe.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    db.delete(recipe)
-    db.commit()
+    # Comments, likes and category links go in one statement each, however many there are
+    for statement in (
+        delete(Comment).where(Comment.recipe_id == recipe_id),
+        delete(Like).where(Like.recipe_id == recipe_id),
+        delete(recipe_categories).where(recipe_categories.c.recipe_id == recipe_id),
+    ):
+        await db.execute(statement.execution_options(synchronize_session=False))
+    await db.delete(recipe)
+    await db.commit()
+    await release_upload(db, recipe.image_url, background_tasks)
     return {"message": "Recipe deleted successfully"}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..database import get_db
+from ..schemas import Suggestion
+from ..suggest import suggest_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=20), db: Session = Depends(get_db)):
+    """Suggest recipe titles, ingredients and categories for a typed prefix, tolerating typos"""
+    suggest_index.ensure_loaded(db)
+    return suggest_index.suggest(q, limit)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 
-from ..database import get_db
-from ..models import User
-from ..schemas import UserResponse
+from ..database import get_async_db, get_db
+from ..models import Like, Recipe, User
+from ..pagination import NEXT_CURSOR_HEADER, paginate
+from ..queries import summary_select
+from ..schemas import RecipeList, UserResponse
+from ..serialization import summaries_response
 from .auth import get_current_user
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -13,6 +18,33 @@ router = APIRouter(prefix="/users", tags=["users"])
 def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+@router.get("/me/likes", response_model=List[RecipeList])
+async def read_my_likes(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recipes the current user liked, most recently liked first, paged by X-Next-Cursor"""
+    # Pages walk the user's likes by (created_at, id), then one query loads those recipes
+    statement = select(Like).options(
+        load_only(Like.id, Like.recipe_id, Like.created_at)
+    ).where(Like.user_id == current_user.id)
+    try:
+        likes, next_cursor = await paginate(db, statement, Like.created_at, Like.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    recipe_ids = [like.recipe_id for like in likes]
+    recipes = {}
+    if recipe_ids:
+        result = await db.scalars(summary_select().where(Recipe.id.in_(recipe_ids)))
+        recipes = {recipe.id: recipe for recipe in result.unique()}
+    return summaries_response([recipes[recipe_id] for recipe_id in recipe_ids if recipe_id in recipes], response)
+
 @router.get("/", response_model=List[UserResponse])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     users = db.query(User).offset(skip).limit(limit).all()
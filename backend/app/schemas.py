@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, computed_field
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from .images import image_variants as variant_urls
+
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -37,6 +39,21 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+# A user embedded in recipe responses. The email was validated when the account was
+# saved, so it is read back as a plain string: re-validating EmailStr for every
+# recipe of a listing was most of its serialization cost.
+class Author(BaseModel):
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -107,7 +124,7 @@ class Recipe(RecipeBase):
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    author: User
+    author: Author
     categories: List[Category] = []
     likes_count: int = 0
     comments_count: int = 0
@@ -122,33 +139,28 @@ class RecipeResponse(RecipeBase):
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    author: User
+    author: Author
     categories: List[Category] = []
     likes_count: int = 0
     comments_count: int = 0
 
     class Config:
         from_attributes = True
-    
+
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Resized copies of the image: {"thumb"|"card"|"full": {"jpeg"|"webp": url}}"""
+        return variant_urls(self.image_url)
+
     @classmethod
     def from_orm(cls, obj):
-        # Create a copy of the object data
-        data = obj.__dict__.copy()
-        
-        # Replace ingredients and steps with parsed lists
-        data['ingredients'] = obj.ingredients_list
-        data['steps'] = obj.steps_list
-        data['likes_count'] = obj.likes_count
-        data['comments_count'] = obj.comments_count
-        
-        # Ensure author is included
-        if hasattr(obj, 'author') and obj.author:
-            data['author'] = obj.author
-        
-        # Remove SQLAlchemy internal attributes
-        data.pop('_sa_instance_state', None)
-        
-        return cls(**data)
+        return cls.model_validate(obj)
+
+
+class RecipeBatch(BaseModel):
+    recipes: List[RecipeResponse]  # in the requested order
+    missing: List[int] = []  # requested ids with no recipe
 
 
 class RecipeList(BaseModel):
@@ -156,8 +168,12 @@ class RecipeList(BaseModel):
     title: str
     description: Optional[str] = None
     image_url: Optional[str] = None
+    prep_time: Optional[int] = None
+    cook_time: Optional[int] = None
+    servings: Optional[int] = None
+    difficulty: Optional[str] = None
     author_id: int
-    author: User
+    author: Author
     categories: List[Category] = []
     likes_count: int = 0
     comments_count: int = 0
@@ -166,6 +182,25 @@ class RecipeList(BaseModel):
     class Config:
         from_attributes = True
 
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Resized copies of the image: {"thumb"|"card"|"full": {"jpeg"|"webp": url}}"""
+        return variant_urls(self.image_url)
+
+
+class RecipeMatch(BaseModel):
+    recipe: RecipeList
+    coverage: float  # share of required ingredients available, 0..1
+    matched: List[str] = []
+    missing: List[str] = []
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # recipe, ingredient or category
+    id: Optional[int] = None
+
 
 class CommentBase(BaseModel):
     content: str
@@ -207,6 +242,10 @@ class LikeCreate(BaseModel):
     pass
 
 
+class LikeStatus(BaseModel):
+    liked: List[int]  # the requested recipe ids the current user has liked
+
+
 class Like(BaseModel):
     id: int
     user_id: int
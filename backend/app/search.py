@@ -0,0 +1,148 @@
+# Full-text recipe search over title, description and ingredients.
+# PostgreSQL uses a generated tsvector column with the "russian" configuration and a GIN index.
+# SQLite has no Russian stemmer, so recipes are stemmed with Snowball into the recipes_fts
+# FTS5 table, which the ORM events at the bottom of this module keep in sync.
+import json
+import re
+from typing import Optional
+
+import snowballstemmer
+from sqlalchemy import DDL, column, event, false, func, inspect, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Recipe
+
+WORD_RE = re.compile(r"\w+")
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('russian', ingredients, '[\"string\"]'), 'C')"
+)
+
+POSTGRES_DDL = [
+    f"ALTER TABLE recipes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX ix_recipes_search_vector ON recipes USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+    "title, description, ingredients, tokenize='unicode61 remove_diacritics 2')",
+]
+
+# bm25 column weights for title, description and ingredients
+SQLITE_WEIGHTS = (10.0, 4.0, 2.0)
+
+recipes_fts = table("recipes_fts", column("rowid"), column("title"), column("description"), column("ingredients"))
+search_vector = literal_column("recipes.search_vector")
+
+_stemmer = snowballstemmer.stemmer("russian")
+
+
+def stem_words(value: Optional[str]) -> list:
+    """Split text into lowercase words reduced to their Russian stems"""
+    if not value:
+        return []
+    words = WORD_RE.findall(value.lower().replace("ё", "е"))
+    return _stemmer.stemWords(words)
+
+
+def _ingredients_text(ingredients) -> str:
+    if not ingredients:
+        return ""
+    if isinstance(ingredients, str):
+        try:
+            ingredients = json.loads(ingredients)
+        except json.JSONDecodeError:
+            return ingredients
+    return " ".join(str(item) for item in ingredients)
+
+
+def recipe_document(title, description, ingredients) -> dict:
+    """Build the stemmed FTS5 row for a recipe"""
+    return {
+        "title": " ".join(stem_words(title)),
+        "description": " ".join(stem_words(description)),
+        "ingredients": " ".join(stem_words(_ingredients_text(ingredients))),
+    }
+
+
+def _fts_query(query_text: str) -> Optional[str]:
+    stems = stem_words(query_text)
+    if not stems:
+        return None
+    # Every stem must match; the prefix star keeps half-typed words matching
+    return " ".join(f'"{stem}"*' for stem in stems)
+
+
+def match_clause(db: AsyncSession, query_text: str):
+    """Return a filter on Recipe selecting rows that match query_text"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return search_vector.op("@@")(func.websearch_to_tsquery("russian", query_text))
+    if dialect == "sqlite":
+        fts_query = _fts_query(query_text)
+        if fts_query is None:
+            return false()
+        matches = select(recipes_fts.c.rowid).where(text("recipes_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+        return Recipe.id.in_(matches)
+    return Recipe.title.ilike(f"%{query_text}%")
+
+
+def ranked(db: AsyncSession, query, query_text: str):
+    """Filter query to recipes matching query_text and order it by relevance, best first"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("russian", query_text)
+        return query.filter(search_vector.op("@@")(tsquery)).order_by(
+            func.ts_rank_cd(search_vector, tsquery).desc(), Recipe.id.desc()
+        )
+    if dialect == "sqlite":
+        fts_query = _fts_query(query_text)
+        if fts_query is None:
+            return query.filter(false())
+        weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+        matches = (
+            select(recipes_fts.c.rowid.label("recipe_id"), literal_column(f"bm25(recipes_fts, {weights})").label("rank"))
+            .where(text("recipes_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+            .subquery()
+        )
+        # bm25 scores are negative, lower is more relevant
+        return query.join(matches, matches.c.recipe_id == Recipe.id).order_by(matches.c.rank, Recipe.id.desc())
+    return query.filter(match_clause(db, query_text)).order_by(Recipe.id.desc())
+
+
+for statement in POSTGRES_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Recipe.__table__, "before_drop", DDL("DROP TABLE IF EXISTS recipes_fts").execute_if(dialect="sqlite"))
+
+
+def _index_recipe(connection, target):
+    connection.execute(
+        recipes_fts.insert().values(rowid=target.id, **recipe_document(target.title, target.description, target.ingredients))
+    )
+
+
+@event.listens_for(Recipe, "after_insert")
+def _recipe_inserted(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        _index_recipe(connection, target)
+
+
+@event.listens_for(Recipe, "after_update")
+def _recipe_updated(mapper, connection, target):
+    if connection.dialect.name != "sqlite":
+        return
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ("title", "description", "ingredients")):
+        return
+    connection.execute(recipes_fts.delete().where(recipes_fts.c.rowid == target.id))
+    _index_recipe(connection, target)
+
+
+@event.listens_for(Recipe, "after_delete")
+def _recipe_deleted(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        connection.execute(recipes_fts.delete().where(recipes_fts.c.rowid == target.id))
@@ -1,8 +1,9 @@
-import json
 from sqlalchemy.orm import Session
 from .database import SessionLocal, engine
 from .models import Base, User, Category, Recipe, Comment, Like
 from .auth import get_password_hash
+from .counters import reconcile_counters
+from . import search  # noqa: F401  registers the full-text index DDL and sync hooks
 
 def create_tables():
     """Create all tables"""
@@ -158,8 +159,8 @@ def seed_data():
             recipe = Recipe(
                 title=recipe_data["title"],
                 description=recipe_data["description"],
-                ingredients=json.dumps(recipe_data["ingredients"]),
-                steps=json.dumps(recipe_data["steps"]),
+                ingredients=recipe_data["ingredients"],
+                steps=recipe_data["steps"],
                 prep_time=recipe_data["prep_time"],
                 cook_time=recipe_data["cook_time"],
                 servings=recipe_data["servings"],
@@ -216,6 +217,9 @@ def seed_data():
         
         db.commit()
         
+        # Comments and likes above are inserted directly, so fill in the recipe counters
+        reconcile_counters(db)
+        
         print("Seed data created successfully!")
         
     except Exception as e:
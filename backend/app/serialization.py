@@ -0,0 +1,53 @@
+from typing import Iterable, List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .schemas import RecipeBatch, RecipeList, RecipeResponse
+
+# Recipe reads return their JSON directly instead of through response_model. FastAPI
+# would dump the returned models, validate the result against the response model a
+# second time and encode it with the stdlib json module. Here the ORM objects are
+# validated once and pydantic-core writes the JSON from the validated models.
+_RECIPE = TypeAdapter(RecipeResponse)
+_RECIPES = TypeAdapter(List[RecipeResponse])
+_SUMMARIES = TypeAdapter(List[RecipeList])
+_BATCH = TypeAdapter(RecipeBatch)
+
+
+def _json_response(content: bytes, response: Response) -> Response:
+    # Keep the headers (ETag, X-Next-Cursor, ...) the route set on its injected response
+    return Response(content, media_type="application/json", headers=response.headers)
+
+
+def recipe_json(recipe) -> bytes:
+    return _RECIPE.dump_json(_RECIPE.validate_python(recipe))
+
+
+def recipes_json(recipes: Iterable) -> bytes:
+    """Validate and encode a whole list of recipes in one pass"""
+    return _RECIPES.dump_json(_RECIPES.validate_python(list(recipes)))
+
+
+def summaries_json(recipes: Iterable) -> bytes:
+    return _SUMMARIES.dump_json(_SUMMARIES.validate_python(list(recipes)))
+
+
+def batch_json(recipes: Iterable, missing: List[int]) -> bytes:
+    return _BATCH.dump_json(_BATCH.validate_python({"recipes": list(recipes), "missing": missing}))
+
+
+def recipe_response(recipe, response: Response) -> Response:
+    return _json_response(recipe_json(recipe), response)
+
+
+def recipes_response(recipes: Iterable, response: Response) -> Response:
+    return _json_response(recipes_json(recipes), response)
+
+
+def summaries_response(recipes: Iterable, response: Response) -> Response:
+    return _json_response(summaries_json(recipes), response)
+
+
+def batch_response(recipes: Iterable, missing: List[int], response: Response) -> Response:
+    return _json_response(batch_json(recipes, missing), response)
@@ -0,0 +1,153 @@
+import os
+import re
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Optional, Set, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from .etag import IMMUTABLE_CACHE_CONTROL, etag_matches, make_etag
+
+# Precompressed siblings looked up next to a file, in order of preference
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+RANGE_RE = re.compile(r"^bytes=\s*(\d*)-(\d*)\s*$")
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Set[str]:
+    """Content codings an Accept-Encoding header allows (those not given q=0)"""
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """First and last byte of a single "bytes=" range, or None to send the whole file.
+
+    Malformed and multi-part ranges are ignored, as RFC 9110 allows; a range that
+    lies entirely past the end of the file raises ValueError.
+    """
+    match = RANGE_RE.match(range_header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class FileRangeResponse(FileResponse):
+    """A FileResponse that sends only bytes start..end (inclusive) of the file"""
+
+    def __init__(self, path, start: int, end: int, stat_result: os.stat_result, headers: dict, **kwargs):
+        headers = {
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+            "Content-Length": str(end - start + 1),
+        }
+        super().__init__(path, status_code=206, headers=headers, stat_result=stat_result, **kwargs)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+        if remaining:
+            # The file was truncated while it was being sent
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class UploadFiles(StaticFiles):
+    """StaticFiles for user uploads, whose names are never reused for different content.
+
+    Every response may be cached for a year without revalidation and carries a strong
+    ETag derived from the file name. Single byte ranges are served with 206, and with
+    precompressed enabled a "name.br" or "name.gz" sibling is sent to clients that accept it.
+    """
+
+    def __init__(self, *args, precompressed: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.precompressed = precompressed
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        method = scope["method"]
+        name = os.path.basename(full_path)
+        media_type = guess_type(name)[0] or "application/octet-stream"
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+
+        encoding = None
+        if self.precompressed:
+            headers["Vary"] = "Accept-Encoding"
+            full_path, stat_result, encoding = self._select_encoding(full_path, stat_result, request_headers)
+            if encoding:
+                headers["Content-Encoding"] = encoding
+
+        etag = make_etag(name, encoding, stat_result.st_size)
+        headers["ETag"] = etag
+        if_none_match = request_headers.get("if-none-match")
+        last_modified = Headers(headers={"last-modified": formatdate(stat_result.st_mtime, usegmt=True)})
+        # If-Modified-Since only counts when there is no If-None-Match (RFC 9110, 13.1.3)
+        if etag_matches(if_none_match, etag) or (
+            if_none_match is None and self.is_not_modified(last_modified, request_headers)
+        ):
+            return NotModifiedResponse(Headers(headers=headers))
+
+        if status_code == 200 and request_headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+            except ValueError:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat_result.st_size}"})
+            if byte_range:
+                return FileRangeResponse(
+                    full_path, *byte_range, stat_result=stat_result, headers=headers, media_type=media_type, method=method
+                )
+
+        return FileResponse(
+            full_path, status_code=status_code, headers=headers, media_type=media_type,
+            stat_result=stat_result, method=method,
+        )
+
+    def _select_encoding(self, full_path, stat_result: os.stat_result, request_headers: Headers):
+        accepted = accepted_encodings(request_headers.get("accept-encoding"))
+        for encoding, suffix in PRECOMPRESSED.items():
+            if encoding not in accepted:
+                continue
+            try:
+                encoded_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            return full_path + suffix, encoded_stat, encoding
+        return full_path, stat_result, None
+
@@ -0,0 +1,332 @@
+import bisect
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .commit_hooks import after_commit
+from .ingredients import ingredient_names
+from .models import Recipe, Category
+
+WORD_RE = re.compile(r"\w+")
+MAX_WORD_MATCHES = 200
+MAX_FUZZY_CANDIDATES = 50
+
+RECIPE = "recipe"
+INGREDIENT = "ingredient"
+CATEGORY = "category"
+
+
+def normalize(value: str) -> str:
+    return " ".join(WORD_RE.findall(value.lower().replace("ё", "е")))
+
+
+def _trigrams(word: str) -> Set[str]:
+    # A single start marker anchors prefixes without a first-letter-only gram shared by huge word sets
+    padded = f"${word}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_typos(word: str) -> int:
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def prefix_distance(query: str, word: str, limit: int) -> int:
+    """Edit distance (with transpositions) between query and the closest prefix of word.
+
+    Only the diagonal band of width 2 * limit + 1 is computed; anything beyond
+    limit is reported as limit + 1.
+    """
+    word = word[:len(query) + limit]
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(word) + 1)]
+    for i in range(1, len(query) + 1):
+        current = [over] * (len(word) + 1)
+        if i <= limit:
+            current[0] = i
+        low, high = max(1, i - limit), min(len(word), i + limit)
+        char = query[i - 1]
+        best = over
+        for j in range(low, high + 1):
+            value = previous[j - 1] if char == word[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if previous2 is not None and j > 1 and char == word[j - 2] and query[i - 2] == word[j - 1]:
+                if previous2[j - 2] + 1 < value:
+                    value = previous2[j - 2] + 1
+            current[j] = value
+            if value < best:
+                best = value
+        if best > limit and current[low - 1] > limit:
+            return over
+        previous2, previous = previous, current
+    return min(min(previous[max(0, len(query) - limit):]), over)
+
+
+class _Entry:
+    __slots__ = ("kind", "text", "words", "refs")
+
+    def __init__(self, kind: str, text: str, words: Tuple[str, ...]):
+        self.kind = kind
+        self.text = text
+        self.words = words
+        self.refs: Set[int] = set()
+
+
+class SuggestIndex:
+    """In-memory prefix and trigram index over recipe titles, ingredients and category names.
+
+    Suggestions are entries (a title, an ingredient name or a category name) whose words
+    start with the typed prefix, or are within one or two edits of it. The index is
+    loaded from the database on first use and then kept current per recipe and category.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._loaded = False
+        self._bulk_loading = False
+        # Changes committed while the initial load runs, replayed on top of its snapshot
+        self._pending: Optional[List[tuple]] = None
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._words: Dict[str, Set[Tuple[str, str]]] = {}
+        self._sorted_words: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._recipes: Dict[int, List[Tuple[str, str]]] = {}
+        self._categories: Dict[int, Tuple[str, str]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self):
+        """Drop everything; the index reloads from the database on next use"""
+        with self._lock:
+            self._clear()
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # From here on commits are buffered, so none is lost between the snapshot and the load
+            if self._pending is None:
+                self._pending = []
+        recipes = db.query(Recipe.id, Recipe.title, Recipe.ingredients).all()
+        categories = db.query(Category.id, Category.name).all()
+        with self._lock:
+            # Already loaded by another caller, or reset while this snapshot was read
+            if self._loaded or self._pending is None:
+                return
+            # Words are appended unsorted during the initial load and sorted once at the end
+            self._bulk_loading = True
+            try:
+                for recipe in recipes:
+                    self._set_recipe(recipe.id, recipe.title, recipe.ingredients)
+                for category in categories:
+                    self._set_category(category.id, category.name)
+            finally:
+                self._bulk_loading = False
+                self._sorted_words.sort()
+            for operation, args in self._pending:
+                operation(*args)
+            self._pending = None
+            self._loaded = True
+
+    def committed(self, operation, *args):
+        """Apply a committed change: at once when loaded, after the snapshot while a load runs"""
+        with self._lock:
+            if self._loaded:
+                operation(*args)
+            elif self._pending is not None:
+                self._pending.append((operation, args))
+
+    def set_recipe(self, recipe_id: int, title: str, ingredients):
+        with self._lock:
+            self._set_recipe(recipe_id, title, ingredients)
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_recipe(recipe_id)
+
+    def set_category(self, category_id: int, name: str):
+        with self._lock:
+            self._set_category(category_id, name)
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        words = normalize(query).split()
+        if not words:
+            return []
+        *head, last = words
+
+        with self._lock:
+            best: Dict[Tuple[str, str], int] = {}
+            for word, distance in self._match_word(last, limit):
+                for key in self._words[word]:
+                    entry = self._entries[key]
+                    if head and not all(any(w.startswith(h) for w in entry.words) for h in head):
+                        continue
+                    if distance < best.get(key, distance + 1):
+                        best[key] = distance
+
+            phrase = " ".join(words)
+            ranked = sorted(
+                best.items(),
+                key=lambda item: (
+                    item[1],
+                    not " ".join(self._entries[item[0]].words).startswith(phrase),
+                    -len(self._entries[item[0]].refs),
+                    len(self._entries[item[0]].text),
+                ),
+            )
+            return [self._suggestion(self._entries[key]) for key, _ in ranked[:limit]]
+
+    def _suggestion(self, entry: _Entry) -> dict:
+        return {
+            "text": entry.text,
+            "kind": entry.kind,
+            "id": min(entry.refs) if entry.kind != INGREDIENT else None,
+        }
+
+    def _match_word(self, prefix: str, limit: int) -> Iterable[Tuple[str, int]]:
+        exact = []
+        start = bisect.bisect_left(self._sorted_words, prefix)
+        for word in self._sorted_words[start:start + MAX_WORD_MATCHES]:
+            if not word.startswith(prefix):
+                break
+            exact.append(word)
+        yield from ((word, 0) for word in exact)
+
+        # Typo tolerance is a fallback for prefixes that match nothing as typed
+        typos = _max_typos(prefix)
+        if not typos or exact:
+            return
+        grams = _trigrams(prefix)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        # One edit changes at most three of the query's trigrams
+        threshold = max(1, len(grams) - 3 * typos)
+        found = 0
+        for word, count in shared.most_common(MAX_FUZZY_CANDIDATES):
+            if count < threshold or found >= limit:
+                break
+            distance = prefix_distance(prefix, word, typos)
+            if distance <= typos:
+                found += 1
+                yield word, distance
+
+    def _set_recipe(self, recipe_id: int, title: str, ingredients):
+        self._remove_refs(self._recipes.pop(recipe_id, []), recipe_id)
+        keys = [self._add(RECIPE, title, recipe_id)]
+        if isinstance(ingredients, str):
+            try:
+                ingredients = json.loads(ingredients)
+            except json.JSONDecodeError:
+                ingredients = []
+        for line in ingredients or []:
+            for name in ingredient_names(str(line)):
+                keys.append(self._add(INGREDIENT, name, recipe_id))
+        self._recipes[recipe_id] = [key for key in keys if key]
+
+    def _remove_recipe(self, recipe_id: int):
+        self._remove_refs(self._recipes.pop(recipe_id, []), recipe_id)
+
+    def _set_category(self, category_id: int, name: str):
+        old = self._categories.pop(category_id, None)
+        if old:
+            self._remove_refs([old], category_id)
+        key = self._add(CATEGORY, name, category_id)
+        if key:
+            self._categories[category_id] = key
+
+    def _add(self, kind: str, text: str, ref: int) -> Optional[Tuple[str, str]]:
+        normalized = normalize(text or "")
+        if not normalized:
+            return None
+        key = (kind, normalized)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(kind, text.strip(), tuple(normalized.split()))
+            for word in set(entry.words):
+                self._add_word(word, key)
+        entry.refs.add(ref)
+        return key
+
+    def _remove_refs(self, keys: Iterable[Tuple[str, str]], ref: int):
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            entry.refs.discard(ref)
+            if entry.refs:
+                continue
+            del self._entries[key]
+            for word in set(entry.words):
+                self._remove_word(word, key)
+
+    def _add_word(self, word: str, key: Tuple[str, str]):
+        keys = self._words.get(word)
+        if keys is None:
+            keys = self._words[word] = set()
+            if self._bulk_loading:
+                self._sorted_words.append(word)
+            else:
+                bisect.insort(self._sorted_words, word)
+            for gram in _trigrams(word):
+                self._trigrams[gram].add(word)
+        keys.add(key)
+
+    def _remove_word(self, word: str, key: Tuple[str, str]):
+        keys = self._words.get(word)
+        if keys is None:
+            return
+        keys.discard(key)
+        if keys:
+            return
+        del self._words[word]
+        del self._sorted_words[bisect.bisect_left(self._sorted_words, word)]
+        for gram in _trigrams(word):
+            words = self._trigrams.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._trigrams[gram]
+
+
+suggest_index = SuggestIndex()
+
+
+def _queue(target, operation, *args):
+    # The index decides at commit time: apply now, buffer behind a running load, or skip
+    # because the load has yet to start and its snapshot will include the change
+    after_commit(target, suggest_index.committed, operation, *args)
+
+
+@event.listens_for(Recipe, "after_insert")
+@event.listens_for(Recipe, "after_update")
+def _recipe_saved(mapper, connection, target):
+    _queue(target, suggest_index._set_recipe, target.id, target.title, target.ingredients)
+
+
+@event.listens_for(Recipe, "after_delete")
+def _recipe_deleted(mapper, connection, target):
+    _queue(target, suggest_index._remove_recipe, target.id)
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+def _category_saved(mapper, connection, target):
+    _queue(target, suggest_index._set_category, target.id, target.name)
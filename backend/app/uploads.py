@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .database import SessionLocal
+from .images import UPLOADS_PREFIX, VARIANT_RE, variant_paths
+from .models import Recipe
+from .static import PRECOMPRESSED
+
+logger = logging.getLogger(__name__)
+
+
+def upload_filename(image_url: Optional[str]) -> Optional[str]:
+    """Name of the stored file behind an image_url, or None for external images"""
+    if image_url and image_url.startswith(UPLOADS_PREFIX):
+        return image_url[len(UPLOADS_PREFIX):]
+    return None
+
+
+def reference_counts(db: Session) -> Dict[str, int]:
+    """Number of recipes using each uploaded file"""
+    rows = db.query(Recipe.image_url, func.count(Recipe.id)).filter(
+        Recipe.image_url.like(f"{UPLOADS_PREFIX}%")
+    ).group_by(Recipe.image_url)
+    return {upload_filename(image_url): count for image_url, count in rows}
+
+
+def remove_upload(filename: str, grace: Optional[float] = None) -> bool:
+    """Delete an upload and its variants, unless it was stored or re-uploaded within grace seconds.
+
+    The grace period protects an upload whose recipe is not committed yet.
+    """
+    grace = settings.upload_gc_grace if grace is None else grace
+    path = os.path.join(settings.upload_dir, filename)
+    try:
+        if time.time() - os.path.getmtime(path) < grace:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    precompressed = [path + suffix for suffix in PRECOMPRESSED.values()]
+    for variant in variant_paths(filename) + precompressed:
+        try:
+            os.remove(variant)
+        except FileNotFoundError:
+            pass
+    return True
+
+
+async def release_upload(db: AsyncSession, image_url: Optional[str], background_tasks: BackgroundTasks):
+    """Schedule removal of a recipe's former image once no recipe refers to it"""
+    filename = upload_filename(image_url)
+    if filename is None:
+        return
+    in_use = await db.scalar(select(Recipe.id).where(Recipe.image_url == image_url).limit(1))
+    if in_use is None:
+        background_tasks.add_task(remove_upload, filename)
+
+
+def collect_garbage(db: Session) -> int:
+    """Delete uploads that no recipe refers to, and stale partial uploads; returns how many"""
+    referenced = reference_counts(db)
+    removed = 0
+    for entry in os.scandir(settings.upload_dir):
+        name = entry.name
+        if name.startswith("."):
+            # Partial uploads left behind by a crashed worker
+            if name.endswith(".part") and time.time() - entry.stat().st_mtime > settings.upload_gc_grace:
+                os.remove(entry.path)
+                removed += 1
+            continue
+        # Variants and precompressed copies are removed together with their upload
+        if VARIANT_RE.search(name) or name.endswith(tuple(PRECOMPRESSED.values())):
+            continue
+        if name in referenced or not entry.is_file():
+            continue
+        if remove_upload(name):
+            removed += 1
+    return removed
+
+
+def _collect_garbage_now() -> int:
+    db = SessionLocal()
+    try:
+        return collect_garbage(db)
+    finally:
+        db.close()
+
+
+async def upload_gc_loop():
+    """Run collect_garbage every upload_gc_interval seconds; meant to run as a startup task"""
+    while True:
+        await asyncio.sleep(settings.upload_gc_interval)
+        try:
+            removed = await run_in_threadpool(_collect_garbage_now)
+            if removed:
+                logger.info("Removed %d unreferenced uploads", removed)
+        except Exception:
+            logger.exception("Upload garbage collection failed")
+
+
+if __name__ == "__main__":
+    print(f"Removed {_collect_garbage_now()} unreferenced uploads")
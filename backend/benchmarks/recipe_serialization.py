@@ -0,0 +1,62 @@
+"""Per-recipe cost of serializing a GET /recipes page.
+
+Compares FastAPI's response_model path (one model per recipe, validated again and
+encoded with the stdlib json module) with app.serialization. Run from backend/:
+
+    python -m benchmarks.recipe_serialization
+"""
+import asyncio
+import json
+import timeit
+from datetime import datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import Category, Recipe, User
+from app.schemas import RecipeResponse
+from app.serialization import recipes_json
+
+PAGE_SIZE = 100
+ROUNDS = 50
+
+
+def make_page() -> List[Recipe]:
+    now = datetime.now()
+    author = User(id=1, email="chef@example.com", username="Шеф", is_active=True, created_at=now)
+    categories = [Category(id=1, name="Супы", description="Первые блюда"), Category(id=2, name="Обед")]
+    return [
+        Recipe(
+            id=i, title="Борщ украинский", description="Наваристый борщ на говяжьем бульоне",
+            ingredients=["500г говядины на кости"] * 10,
+            steps=["Обжарить лук до золотистого цвета"] * 8,
+            prep_time=20, cook_time=90, servings=6, difficulty="medium", image_url=f"/uploads/{i:064x}.jpg",
+            author_id=1, author=author, categories=categories, created_at=now, updated_at=now,
+            likes_count=3, comments_count=4,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+RESPONSE_FIELD = create_response_field(name="Response_read_recipes", type_=List[RecipeResponse])
+
+
+def response_model_path(recipes) -> bytes:
+    content = [RecipeResponse.from_orm(recipe) for recipe in recipes]
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=content))
+    return JSONResponse(content).body
+
+
+def main():
+    recipes = make_page()
+    assert json.loads(response_model_path(recipes)) == json.loads(recipes_json(recipes))
+    for name, serialize in (("response_model", response_model_path), ("serialization", recipes_json)):
+        seconds = min(timeit.repeat(lambda: serialize(recipes), number=ROUNDS, repeat=3)) / ROUNDS
+        size = len(serialize(recipes))
+        print(f"{name:>15}: {seconds / PAGE_SIZE * 1e6:7.1f} us/recipe, {size / PAGE_SIZE:6.0f} bytes/recipe")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,39 @@
 import pytest
 import asyncio
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_async_db, Base, dump_json
 from app.models import User, Category, Recipe, Comment, Like
-from app.auth import get_password_hash
+from app.auth import get_password_hash, principal_cache
+from app.cache import reference_cache
 
 # Test database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# JSON columns are encoded the way the application's engines do it
+JSON_OPTIONS = {"json_serializer": dump_json, "json_deserializer": orjson.loads}
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, **JSON_OPTIONS
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same file through aiosqlite; TestClient runs each test on its own event loop,
+# so connections are not pooled across them
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool, **JSON_OPTIONS)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -28,6 +44,8 @@ def event_loop():
 @pytest.fixture
 def db_session():
     """Create a fresh database session for each test."""
+    reference_cache.invalidate()
+    principal_cache.invalidate()
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
@@ -46,6 +64,7 @@ def client(db_session):
             db_session.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -60,6 +79,7 @@ async def async_client(db_session):
             db_session.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
@@ -92,8 +112,8 @@ def test_recipe(db_session, test_user, test_category):
     recipe = Recipe(
         title="Test Recipe",
         description="Test Description",
-        ingredients='["ingredient1", "ingredient2"]',
-        steps='["step1", "step2"]',
+        ingredients=["ingredient1", "ingredient2"],
+        steps=["step1", "step2"],
         author_id=test_user.id,
         
     )
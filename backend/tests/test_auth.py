@@ -1,6 +1,9 @@
+import asyncio
+import jwt as pyjwt
 import pytest
 from fastapi import status
-from app.auth import get_password_hash, verify_password, create_access_token
+from app.auth import get_password_hash, verify_password, create_access_token, pwd_context, HasherBusy, PasswordHasher, principal_cache
+from app.config import settings
 from app.models import User
 
 class TestAuthBusinessLogic:
@@ -51,6 +54,23 @@ class TestAuthBusinessLogic:
         # Токен должен содержать точки (JWT формат)
         assert token.count(".") == 2
 
+    def test_hasher_runs_off_thread(self):
+        """Тест хеширования в отдельном пуле потоков."""
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        hashed = asyncio.run(hasher.hash("pass123"))
+
+        assert verify_password("pass123", hashed)
+        assert asyncio.run(hasher.verify_and_update("pass123", hashed)) == (True, None)
+        assert hasher.stats()["completed"] == 2
+
+    def test_hasher_queue_limit(self):
+        """Тест отказа при переполнении очереди хеширования."""
+        hasher = PasswordHasher(workers=1, max_queue=0)
+
+        with pytest.raises(HasherBusy):
+            asyncio.run(hasher.hash("pass123"))
+        assert hasher.stats()["rejected"] == 1
+
 class TestAuthAPI:
     """Тесты для API аутентификации."""
     
@@ -178,3 +198,41 @@ class TestAuthAPI:
         response = client.get("/auth/me", headers=headers)
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_upgrades_hash_cost(self, client, db_session, test_user):
+        """Тест перехеширования пароля при входе после смены стоимости bcrypt."""
+        user_id = test_user.id
+        pwd_context.update(bcrypt__rounds=4)
+        try:
+            response = client.post("/auth/login", json={"email": "test@example.com", "password": "pass123"})
+        finally:
+            pwd_context.update(bcrypt__rounds=settings.bcrypt_rounds)
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        hashed = db_session.get(User, user_id).hashed_password
+        assert hashed.startswith("$2b$04$")
+        assert verify_password("pass123", hashed)
+
+    def test_principal_cached_by_token_user_id(self, client, auth_headers, test_user):
+        """Тест: токен содержит ID пользователя, повторные запросы обслуживаются из кэша."""
+        token = auth_headers["Authorization"].split()[1]
+        payload = pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        assert payload["user_id"] == test_user.id
+
+        client.get("/auth/me", headers=auth_headers)
+        hits = principal_cache.stats()["hits"]
+        response = client.get("/auth/me", headers=auth_headers)
+
+        assert response.json()["username"] == "testuser"
+        assert principal_cache.stats()["hits"] == hits + 1
+
+    def test_deactivation_invalidates_principal(self, client, db_session, auth_headers, test_user):
+        """Тест: деактивированный пользователь сразу теряет доступ."""
+        assert client.get("/auth/me", headers=auth_headers).status_code == status.HTTP_200_OK
+
+        test_user.is_active = False
+        db_session.commit()
+
+        response = client.get("/auth/me", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,45 @@
+import time
+from app.cache import TTLCache
+
+
+class TestTTLCacheBusinessLogic:
+    """Тесты для кэша справочных данных."""
+
+    def test_hits_and_misses(self):
+        """Тест подсчета попаданий и промахов."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        loads = []
+
+        for _ in range(3):
+            value = cache.get_or_load("key", lambda: loads.append(1) or "value")
+
+        assert value == "value"
+        assert len(loads) == 1
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных записей."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_expiry_and_invalidation(self):
+        """Тест истечения срока жизни и сброса по пространству имен."""
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.set("old", 1)
+        time.sleep(0.02)
+        assert cache.get("old") is None
+
+        cache.ttl = 60
+        cache.set(("categories", 1), 1)
+        cache.set(("other", 1), 2)
+        cache.invalidate("categories")
+        assert cache.get(("categories", 1)) is None
+        assert cache.get(("other", 1)) == 2
@@ -45,8 +45,8 @@ class TestCategoryBusinessLogic:
         recipe = Recipe(
             title="Test Recipe",
             description="Test Description",
-            ingredients='["ingredient1"]',
-            steps='["step1"]',
+            ingredients=["ingredient1"],
+            steps=["step1"],
             author_id=test_user.id
         )
         recipe.categories.append(category)
@@ -70,16 +70,16 @@ class TestCategoryBusinessLogic:
         recipe1 = Recipe(
             title="Recipe 1",
             description="Description 1",
-            ingredients='["ingredient1"]',
-            steps='["step1"]',
+            ingredients=["ingredient1"],
+            steps=["step1"],
             author_id=test_user.id
         )
         recipe1.categories.append(category)
         recipe2 = Recipe(
             title="Recipe 2",
             description="Description 2",
-            ingredients='["ingredient2"]',
-            steps='["step2"]',
+            ingredients=["ingredient2"],
+            steps=["step2"],
             author_id=test_user.id
         )
         recipe2.categories.append(category)
@@ -198,3 +198,31 @@ class TestCategoryAPI:
         # Если система не чувствительна к регистру, должна быть ошибка
         # Если чувствительна, то успех
         assert response.status_code == 200
+
+    def test_categories_not_modified(self, client, auth_headers, test_category):
+        """Тест ответа 304 для списка категорий до добавления новой."""
+        etag = client.get("/categories/").headers["etag"]
+
+        response = client.get("/categories/", headers={"If-None-Match": f'W/{etag}, "other"'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/categories", json={"name": "Новая"}, headers=auth_headers)
+        response = client.get("/categories/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+
+    def test_categories_cached_until_created(self, client, db_session, auth_headers, test_category):
+        """Тест кэширования списка категорий и сброса кэша при создании категории."""
+        client.get("/categories/")
+
+        # Изменение в обход API не видно, пока кэш не сброшен
+        db_session.add(Category(name="В обход API"))
+        db_session.commit()
+        assert len(client.get("/categories/").json()) == 1
+
+        client.post("/categories", json={"name": "Новая"}, headers=auth_headers)
+        assert len(client.get("/categories/").json()) == 3
+
+        stats = client.get("/metrics/cache").json()["reference"]
+        assert stats["hits"] >= 1
+        assert stats["misses"] >= 2
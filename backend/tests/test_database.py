@@ -0,0 +1,84 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from app.database import PoolMetrics, async_database_url, configure_sqlite, engine_options, metered_pool
+from app.models import Like
+
+
+class TestDatabaseBusinessLogic:
+    """Тесты настройки подключений к базе данных."""
+
+    def test_async_database_url(self):
+        """Тест выбора asyncio-драйвера по адресу базы данных."""
+        assert str(async_database_url("sqlite:///./cookbook.db")) == "sqlite+aiosqlite:///./cookbook.db"
+        assert async_database_url("postgresql://postgres:1662@db:5432/cookbook_db").drivername == "postgresql+asyncpg"
+
+    def test_engine_options(self):
+        """Тест параметров пула для файловой и in-memory базы."""
+        options = engine_options("postgresql://postgres@db/cookbook_db", QueuePool, PoolMetrics())
+        assert options["pool_size"] == 5
+        assert options["pool_pre_ping"] is True
+        assert "connect_args" not in options
+        assert "poolclass" not in engine_options("sqlite://", QueuePool, PoolMetrics())
+
+    def test_sqlite_pragmas(self, tmp_path):
+        """Тест профиля PRAGMA для SQLite."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        configure_sqlite(engine)
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        engine.dispose()
+
+    def test_pool_metrics(self, tmp_path):
+        """Тест учета выдачи соединений и переполнения пула."""
+        metrics = PoolMetrics()
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=metered_pool(QueuePool, metrics), pool_size=1, max_overflow=1,
+        )
+        first, second = engine.connect(), engine.connect()
+        stats = metrics.stats(engine.pool)
+        first.close()
+        second.close()
+        engine.dispose()
+
+        assert stats["checkouts"] == 2
+        assert stats["overflow_checkouts"] == 1
+        assert stats["checkedout"] == 2
+
+    def test_pool_metrics_reused_connection(self, tmp_path):
+        """Тест: выдача свободного соединения при занятом переполнении не считается переполнением."""
+        metrics = PoolMetrics()
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=metered_pool(QueuePool, metrics), pool_size=1, max_overflow=2,
+        )
+        first, second = engine.connect(), engine.connect()
+        first.close()
+        third = engine.connect()
+        stats = metrics.stats(engine.pool)
+        second.close()
+        third.close()
+        engine.dispose()
+
+        assert stats["checkouts"] == 3
+        assert stats["overflow_checkouts"] == 1
+
+
+class TestAsyncDatabaseAPI:
+    """Тесты асинхронных маршрутов."""
+
+    def test_async_routes_with_sync_writes(self, client, db_session, auth_headers, test_recipe):
+        """Тест: асинхронные маршруты видят данные, записанные синхронной сессией."""
+        recipe_id = test_recipe.id
+        client.post(f"/recipes/{recipe_id}/like", headers=auth_headers)
+
+        assert client.get(f"/recipes/{recipe_id}/is-liked", headers=auth_headers).json()["is_liked"] is True
+        assert db_session.query(Like).filter(Like.recipe_id == recipe_id).count() == 1
+
+    def test_pool_metrics_endpoint(self, client):
+        """Тест эндпоинта статистики пула соединений."""
+        data = client.get("/metrics/pool").json()
+        assert set(data) == {"sync", "async"}
+        assert "wait_avg_ms" in data["sync"]
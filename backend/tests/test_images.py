@@ -0,0 +1,228 @@
+import asyncio
+import io
+import struct
+import zlib
+import pytest
+from fastapi import status
+from PIL import Image
+from app.config import settings
+from app.images import image_variants, render_variants, VARIANTS
+from app.image_cache import ImageCache, image_cache, snap_width
+
+
+def image_bytes(format="PNG", size=(32, 32)) -> bytes:
+    """Создает небольшое изображение в памяти."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, format=format)
+    return buffer.getvalue()
+
+
+RECIPE_FORM = {
+    "title": "Блины",
+    "description": "Тонкие блины",
+    "ingredients": '["мука", "молоко"]',
+    "steps": '["Смешать", "Жарить"]',
+}
+
+
+def png_header(width: int, height: int) -> bytes:
+    """PNG из одного заголовка: размеры заявлены, пикселей нет."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IEND", b"")
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Направляет загрузки во временный каталог."""
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def resize_cache(tmp_path, monkeypatch):
+    """Пустой кэш уменьшенных изображений во временном каталоге."""
+    monkeypatch.setattr(image_cache, "directory", str(tmp_path / "cache"))
+    image_cache.reset()
+    yield image_cache
+    image_cache.reset()
+
+
+class TestImageVariantsBusinessLogic:
+    """Тесты для уменьшенных копий изображений."""
+
+    def test_render_variants(self, tmp_path):
+        """Тест размеров и форматов копий."""
+        original = tmp_path / "photo.png"
+        original.write_bytes(image_bytes(size=(2000, 1000)))
+
+        written = render_variants(str(original))
+
+        assert len(written) == len(VARIANTS) * 2
+        with Image.open(tmp_path / "photo_card.webp") as card:
+            assert card.size == (640, 320)
+        with Image.open(tmp_path / "photo_thumb.jpg") as thumb:
+            assert thumb.format == "JPEG"
+            assert thumb.size == (200, 100)
+
+    def test_variant_urls(self):
+        """Тест URL копий только для загруженных файлов."""
+        variants = image_variants("/uploads/abc.png")
+        assert variants["card"] == {"jpeg": "/uploads/abc_card.jpg", "webp": "/uploads/abc_card.webp"}
+        assert image_variants("https://example.com/photo.jpg") is None
+        assert image_variants(None) is None
+
+
+class TestImageUploadAPI:
+    """Тесты для загрузки изображений рецептов."""
+
+    def test_create_recipe_with_image(self, client, auth_headers, upload_dir):
+        """Тест создания рецепта с изображением."""
+        response = client.post(
+            "/recipes/", data=RECIPE_FORM, files={"image": ("photo.jpeg", image_bytes("JPEG"), "image/jpeg")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        image_url = response.json()["image_url"]
+        assert image_url.endswith(".jpg")
+        assert (upload_dir / image_url.rsplit("/", 1)[1]).exists()
+
+    def test_variants_rendered_in_background(self, client, auth_headers, upload_dir):
+        """Тест фоновой генерации уменьшенных копий и их URL в ответе."""
+        response = client.post(
+            "/recipes/", data=RECIPE_FORM, files={"image": ("photo.png", image_bytes(size=(1000, 500)), "image/png")},
+            headers=auth_headers,
+        )
+
+        variants = response.json()["image_variants"]
+        assert set(variants) == set(VARIANTS)
+        for urls in variants.values():
+            for url in urls.values():
+                assert (upload_dir / url.rsplit("/", 1)[1]).exists()
+        summary = client.get("/recipes/summary").json()[0]
+        assert summary["image_variants"] == variants
+
+    def test_update_recipe_image(self, client, auth_headers, test_recipe, upload_dir):
+        """Тест замены изображения при редактировании рецепта."""
+        response = client.put(
+            f"/recipes/{test_recipe.id}", data=RECIPE_FORM, files={"image": ("photo", image_bytes(), "image/png")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["image_url"].endswith(".png")
+        assert response.json()["title"] == "Блины"
+
+    def test_not_an_image_rejected(self, client, auth_headers, upload_dir):
+        """Тест отклонения файла, который не является изображением."""
+        response = client.post(
+            "/recipes/", data=RECIPE_FORM, files={"image": ("photo.png", b"not an image", "image/png")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(upload_dir.iterdir()) == []
+
+    def test_oversized_image_rejected(self, client, auth_headers, upload_dir, monkeypatch):
+        """Тест отклонения файла больше max_file_size без остатков на диске."""
+        monkeypatch.setattr(settings, "max_file_size", 1024)
+        response = client.post(
+            "/recipes/", data=RECIPE_FORM, files={"image": ("big.png", image_bytes(size=(512, 512)), "image/png")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert list(upload_dir.iterdir()) == []
+
+    def test_oversized_body_rejected_before_parsing(self, client, auth_headers, upload_dir):
+        """Тест отклонения запроса по Content-Length до чтения тела."""
+        too_big = settings.max_file_size + settings.max_form_fields_size + 1
+        response = client.post(
+            "/recipes/", data=RECIPE_FORM, files={"image": ("big.png", b"0" * too_big, "image/png")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert response.json()["detail"] == "Request body too large"
+
+
+class TestImageCacheBusinessLogic:
+    """Тесты для дискового LRU-кэша уменьшенных изображений."""
+
+    def test_snap_width(self):
+        """Тест округления ширины до стандартной."""
+        assert snap_width(300) == 320
+        assert snap_width(320) == 320
+        assert snap_width(5000) == 1920
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """Тест вытеснения давно не запрошенных файлов при превышении размера."""
+        source = tmp_path / "photo.png"
+        source.write_bytes(image_bytes(size=(800, 600)))
+        cache = ImageCache(str(tmp_path / "cache"), max_bytes=1)
+
+        async def render_two():
+            first = await cache.get(str(source), 160, "jpeg")
+            second = await cache.get(str(source), 320, "jpeg")
+            return first, second
+
+        first, second = asyncio.run(render_two())
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 1
+        assert not (tmp_path / "cache" / first.rsplit("/", 1)[1]).exists()
+        with Image.open(second) as image:
+            assert image.size == (320, 240)
+
+    def test_concurrent_requests_coalesced(self, tmp_path):
+        """Тест: одновременные запросы одной копии рендерят ее один раз."""
+        source = tmp_path / "photo.png"
+        source.write_bytes(image_bytes(size=(800, 600)))
+        cache = ImageCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+
+        async def render_many():
+            return await asyncio.gather(*(cache.get(str(source), 480, "webp") for _ in range(5)))
+
+        paths = asyncio.run(render_many())
+
+        assert len(set(paths)) == 1
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 4
+
+
+class TestResizeAPI:
+    """Тесты для эндпоинта /img."""
+
+    def test_resize_and_cache_hit(self, client, upload_dir, resize_cache):
+        """Тест уменьшения по запросу и повторной выдачи из кэша."""
+        (upload_dir / "photo.jpg").write_bytes(image_bytes("JPEG", size=(1000, 500)))
+
+        response = client.get("/img/photo.jpg", params={"w": 300, "fmt": "webp"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "image/webp"
+        assert "immutable" in response.headers["cache-control"]
+        with Image.open(io.BytesIO(response.content)) as image:
+            assert image.size == (320, 160)
+
+        assert client.get("/img/photo.jpg", params={"w": 320, "fmt": "webp"}).content == response.content
+        stats = client.get("/metrics/image-cache").json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_missing_and_invalid_sources(self, client, upload_dir, resize_cache):
+        """Тест ответов для отсутствующего файла и файла, не являющегося изображением."""
+        (upload_dir / "notes.png").write_bytes(b"not an image")
+
+        assert client.get("/img/missing.jpg", params={"w": 320}).status_code == status.HTTP_404_NOT_FOUND
+        assert client.get("/img/notes.png", params={"w": 320}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get("/img/notes.png", params={"w": 320, "fmt": "gif"}).status_code == 422
+
+    def test_decompression_bomb_rejected(self, client, upload_dir, resize_cache):
+        """Тест: маленький файл с огромными размерами отклоняется с 400, а не 500."""
+        (upload_dir / "bomb.png").write_bytes(png_header(50000, 50000))
+
+        assert client.get("/img/bomb.png", params={"w": 320}).status_code == status.HTTP_400_BAD_REQUEST
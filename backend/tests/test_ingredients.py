@@ -0,0 +1,110 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import status
+from app.models import Recipe
+from app.ingredients import IngredientIndex, ingredient_index, parse_ingredient, ingredient_names
+
+
+@pytest.fixture(autouse=True)
+def fresh_ingredient_index():
+    """Сбрасывает индекс ингредиентов между тестами."""
+    ingredient_index.reset()
+    yield
+    ingredient_index.reset()
+
+
+class TestIngredientParsing:
+    """Тесты для разбора строк ингредиентов."""
+
+    def test_quantities_removed(self):
+        """Тест удаления количества и единиц измерения."""
+        assert ingredient_names("500г говядины на кости") == ["говядины на кости"]
+        assert ingredient_names("2 ст.л. томатной пасты") == ["томатной пасты"]
+        assert ingredient_names("2-3 зубчика чеснока") == ["чеснока"]
+        assert ingredient_names("½ стакана молока") == ["молока"]
+
+    def test_line_split_into_ingredients(self):
+        """Тест разбора нескольких ингредиентов в одной строке."""
+        assert ingredient_names("Укроп и петрушка") == ["укроп", "петрушка"]
+        assert ingredient_names("Соль, перец по вкусу") == ["соль", "перец"]
+
+    def test_optional_and_stemmed(self):
+        """Тест необязательных ингредиентов и нормализации словоформ."""
+        salt, = parse_ingredient("Соль по вкусу")
+        beef, = parse_ingredient("500г говядины на кости")
+
+        assert salt.optional is True
+        assert beef.optional is False
+        assert parse_ingredient("говядина")[0].terms <= beef.terms
+
+
+class TestIngredientIndex:
+    """Тесты для инвертированного индекса ингредиентов."""
+
+    def test_ranked_by_coverage(self):
+        """Тест ранжирования рецептов по доле имеющихся ингредиентов."""
+        index = IngredientIndex()
+        index.set_recipe(1, '["2 картофелины", "курица", "морковь"]')
+        index.set_recipe(2, '["курица", "картофель", "Соль по вкусу"]')
+        index.set_recipe(3, '["говядина", "свекла"]')
+
+        matches = index.match(["Курица", "картофель"])
+
+        assert [match["recipe_id"] for match in matches] == [2, 1]
+        assert matches[0]["coverage"] == 1.0
+        assert matches[1]["missing"] == ["морковь"]
+
+    def test_commit_during_load(self, db_session, test_user):
+        """Тест: рецепт, сохраненный во время первичной загрузки индекса, не теряется."""
+        class LateCommit:
+            """Сессия, в которую коммитят новый рецепт сразу после чтения снимка."""
+            def query(self, *columns):
+                rows = db_session.query(*columns).all()
+                db_session.add(Recipe(title="Плов", ingredients=["рис"], steps=[], author_id=test_user.id))
+                db_session.commit()
+                return SimpleNamespace(all=lambda: rows)
+
+        ingredient_index.ensure_loaded(LateCommit())
+
+        assert len(ingredient_index.match(["рис"])) == 1
+
+    def test_update_and_remove(self):
+        """Тест обновления и удаления рецепта в индексе."""
+        index = IngredientIndex()
+        index.set_recipe(1, '["курица"]')
+        index.set_recipe(1, '["рыба"]')
+
+        assert index.match(["курица"]) == []
+        assert [match["recipe_id"] for match in index.match(["рыба"])] == [1]
+
+        index.remove_recipe(1)
+        assert index.match(["рыба"]) == []
+
+
+class TestIngredientAPI:
+    """Тесты для поиска рецептов по имеющимся ингредиентам."""
+
+    def test_recipes_by_ingredients(self, client, db_session, test_user):
+        """Тест поиска рецептов по списку ингредиентов."""
+        soup = Recipe(title="Суп", ingredients=["2 картофелины", "1 морковь"], steps=[], author_id=test_user.id)
+        db_session.add(soup)
+        db_session.commit()
+        soup_id = soup.id
+
+        response = client.get("/recipes/by-ingredients", params={"ingredients": ["картофелина"]})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data[0]["recipe"]["id"] == soup_id
+        assert data[0]["coverage"] == 0.5
+        assert data[0]["missing"] == ["морковь"]
+
+    def test_index_follows_new_recipes(self, client, db_session, test_user):
+        """Тест появления нового рецепта в индексе после коммита."""
+        client.get("/recipes/by-ingredients", params={"ingredients": ["рис"]})
+
+        db_session.add(Recipe(title="Плов", ingredients=["рис", "баранина"], steps=[], author_id=test_user.id))
+        db_session.commit()
+
+        data = client.get("/recipes/by-ingredients", params={"ingredients": "рис, баранина"}).json()
+        assert [match["recipe"]["title"] for match in data] == ["Плов"]
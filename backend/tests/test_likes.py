@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.counters import add_like, remove_like
+from app.models import Like, Recipe
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_recipes import create_recipes
+
+
+class TestLikeStatusAPI:
+    """Тесты для массовой проверки лайков."""
+
+    def test_like_status(self, client, auth_headers, db_session, test_user):
+        """Тест: возвращаются только лайкнутые рецепты в порядке запроса."""
+        first, second, third = create_recipes(db_session, test_user, 3)
+        db_session.add_all([Like(user_id=test_user.id, recipe_id=first), Like(user_id=test_user.id, recipe_id=third)])
+        db_session.commit()
+
+        response = client.get("/likes/status", params={"ids": f"{third},{second},{first},99999"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"liked": [third, first]}
+
+    def test_like_status_requires_auth(self, client):
+        """Тест: статус лайков доступен только авторизованному пользователю."""
+        assert client.get("/likes/status", params={"ids": "1"}).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_like_status_limit(self, client, auth_headers):
+        """Тест ограничения числа рецептов в запросе."""
+        ids = ",".join(str(i) for i in range(1, 102))
+        assert client.get("/likes/status", params={"ids": ids}, headers=auth_headers).status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestFavoritesAPI:
+    """Тесты для списка избранных рецептов."""
+
+    def test_my_likes_newest_first(self, client, auth_headers, db_session, test_user):
+        """Тест: рецепты в порядке лайков, от последнего, с курсором."""
+        first, second, third = create_recipes(db_session, test_user, 3)
+        for recipe_id in (second, third, first):
+            db_session.add(Like(user_id=test_user.id, recipe_id=recipe_id))
+            db_session.commit()
+
+        page = client.get("/users/me/likes", params={"limit": 2}, headers=auth_headers)
+        rest = client.get("/users/me/likes", params={"limit": 2, "cursor": page.headers["X-Next-Cursor"]}, headers=auth_headers)
+
+        assert page.status_code == status.HTTP_200_OK
+        assert [recipe["id"] for recipe in page.json() + rest.json()] == [first, third, second]
+        assert "X-Next-Cursor" not in rest.headers
+
+    def test_my_likes_pages_walk_all(self, client, auth_headers, db_session, test_user):
+        """Тест: страницы избранного по курсору без пропусков и повторов при совпадающем времени."""
+        recipe_ids = create_recipes(db_session, test_user, 7)
+        db_session.add_all([Like(user_id=test_user.id, recipe_id=recipe_id) for recipe_id in recipe_ids])
+        db_session.commit()
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/users/me/likes", params=params, headers=auth_headers)
+            seen += [recipe["id"] for recipe in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert sorted(seen) == sorted(recipe_ids)
+        assert len(seen) == len(set(seen))
+
+    def test_my_likes_requires_auth(self, client):
+        """Тест: избранное доступно только авторизованному пользователю."""
+        assert client.get("/users/me/likes").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestLikeToggleBusinessLogic:
+    """Тесты для однооператорных лайков."""
+
+    def test_like_is_unique(self, db_session, test_user, test_recipe):
+        """Тест: база не допускает повторный лайк."""
+        db_session.add(Like(user_id=test_user.id, recipe_id=test_recipe.id))
+        db_session.commit()
+        db_session.add(Like(user_id=test_user.id, recipe_id=test_recipe.id))
+
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+
+    def test_add_and_remove_like(self, db_session, test_user, test_recipe):
+        """Тест: счетчик меняется только при реальной вставке или удалении."""
+        user_id, recipe_id = test_user.id, test_recipe.id
+
+        async def toggle():
+            async with TestingAsyncSessionLocal() as db:
+                results = [
+                    await add_like(db, user_id, recipe_id),
+                    await add_like(db, user_id, recipe_id),
+                    await add_like(db, user_id, 99999),
+                ]
+                await db.commit()
+                count = await db.scalar(select(Recipe.likes_count).where(Recipe.id == recipe_id))
+                results += [await remove_like(db, user_id, recipe_id), await remove_like(db, user_id, recipe_id)]
+                await db.commit()
+                return results, count
+
+        results, count = asyncio.run(toggle())
+
+        assert results == [True, False, False, True, False]
+        assert count == 1
+        db_session.expire_all()
+        assert db_session.get(Recipe, recipe_id).likes_count == 0
+
+
+class TestLikeToggleAPI:
+    """Тесты для API лайков."""
+
+    def test_repeated_like_rejected(self, client, auth_headers, db_session, test_recipe):
+        """Тест: повторный лайк не создает вторую запись."""
+        recipe_id = test_recipe.id
+        assert client.post(f"/likes/recipe/{recipe_id}/like", headers=auth_headers).status_code == status.HTTP_200_OK
+
+        response = client.post(f"/likes/recipe/{recipe_id}/like", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert db_session.query(Like).filter(Like.recipe_id == recipe_id).count() == 1
+        assert client.get(f"/likes/recipe/{recipe_id}/count").json()["likes_count"] == 1
+
+    def test_like_missing_recipe(self, client, auth_headers):
+        """Тест лайка и переключения лайка у несуществующего рецепта."""
+        assert client.post("/likes/recipe/99999/like", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+        assert client.post("/recipes/99999/like", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete("/recipes/99999/like", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unlike_not_liked(self, client, auth_headers, test_recipe):
+        """Тест снятия лайка, которого не было."""
+        recipe_id = test_recipe.id
+        assert client.delete(f"/likes/recipe/{recipe_id}/like", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete(f"/recipes/{recipe_id}/like", headers=auth_headers).json()["liked"] is False
@@ -0,0 +1,91 @@
+import gzip
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from app.middleware import CompressionMiddleware
+from app.models import Recipe
+
+PAYLOAD = "Обжарить лук до золотистого цвета. ".encode() * 100
+
+
+def payload_app(media_type):
+    """Приложение, отдающее крупный ответ заданного типа через сжимающий middleware."""
+    async def endpoint(request):
+        return Response(PAYLOAD, media_type=media_type, headers={"ETag": '"v1"'})
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+class TestCompressionBusinessLogic:
+    """Тесты для выбора кодировки сжатия."""
+
+    def test_choose_encoding(self):
+        """Тест выбора кодировки по Accept-Encoding."""
+        assert CompressionMiddleware.choose_encoding("gzip, deflate") == "gzip"
+        assert CompressionMiddleware.choose_encoding("identity") is None
+        assert CompressionMiddleware.choose_encoding("gzip;q=0") is None
+        assert CompressionMiddleware.choose_encoding(None) is None
+
+
+class TestCompressionAPI:
+    """Тесты для сжатия ответов."""
+
+    def test_recipe_compressed(self, client, db_session, test_user):
+        """Тест сжатия крупного JSON-ответа с ослаблением ETag."""
+        recipe = Recipe(title="Борщ", description=PAYLOAD.decode(), ingredients=[], steps=[], author_id=test_user.id)
+        db_session.add(recipe)
+        db_session.commit()
+        recipe_id = recipe.id
+
+        response = client.get(f"/recipes/{recipe_id}", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(PAYLOAD)
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"].startswith('W/"')
+        assert response.json()["description"] == PAYLOAD.decode()
+
+        repeat = client.get(
+            f"/recipes/{recipe_id}",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+        )
+        assert repeat.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_small_and_identity_not_compressed(self, client):
+        """Тест: маленькие ответы и клиенты без поддержки сжатия получают исходные данные."""
+        assert "content-encoding" not in client.get("/health", headers={"Accept-Encoding": "gzip"}).headers
+
+        response = payload_app("application/json").get("/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == PAYLOAD
+
+    def test_images_not_compressed(self):
+        """Тест: изображения отдаются без повторного сжатия."""
+        response = payload_app("image/jpeg").get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"v1"'
+
+    def test_gzip_body(self):
+        """Тест корректности gzip-потока."""
+        client = payload_app("text/plain; charset=utf-8")
+        with client.stream("GET", "/", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert gzip.decompress(raw) == PAYLOAD
+
+    def test_brotli(self):
+        """Тест сжатия Brotli, если модуль установлен."""
+        brotli = pytest.importorskip("brotli")
+        client = payload_app("application/json")
+        with client.stream("GET", "/", headers={"Accept-Encoding": "gzip, br"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "br"
+        assert brotli.decompress(raw) == PAYLOAD
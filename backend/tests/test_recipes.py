@@ -0,0 +1,398 @@
+import pytest
+from fastapi import status
+from sqlalchemy import text
+from app.models import Recipe, Comment, Like, User
+from app.counters import reconcile_counters
+from app.pagination import encode_cursor, decode_cursor
+
+
+def create_recipes(db_session, author, count, title="Recipe", category=None):
+    """Создает несколько рецептов одного автора и возвращает их ID."""
+    recipes = []
+    for i in range(count):
+        recipe = Recipe(
+            title=f"{title} {i}",
+            description="Description",
+            ingredients=["ingredient"],
+            steps=["step"],
+            author_id=author.id
+        )
+        if category is not None:
+            recipe.categories.append(category)
+        db_session.add(recipe)
+        recipes.append(recipe)
+    db_session.commit()
+    return [recipe.id for recipe in recipes]
+
+
+class TestCursorBusinessLogic:
+    """Тесты для курсоров пагинации."""
+
+    def test_cursor_roundtrip(self, db_session, test_recipe):
+        """Тест кодирования и декодирования курсора."""
+        cursor = encode_cursor(test_recipe.created_at, test_recipe.id)
+
+        assert decode_cursor(cursor) == (test_recipe.created_at, test_recipe.id)
+
+    def test_invalid_cursor(self):
+        """Тест декодирования некорректного курсора."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestRecipePaginationAPI:
+    """Тесты для курсорной пагинации рецептов."""
+
+    def test_cursor_pages_cover_all_recipes(self, client, db_session, test_user):
+        """Тест обхода всех рецептов по курсору без повторов и пропусков."""
+        recipe_ids = create_recipes(db_session, test_user, 7)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/recipes/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(recipe["id"] for recipe in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == sorted(recipe_ids, reverse=True)
+
+    def test_last_page_has_no_cursor(self, client, test_recipe):
+        """Тест отсутствия курсора на последней странице."""
+        response = client.get("/recipes/", params={"limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_with_filters(self, client, db_session, test_user, test_category):
+        """Тест курсорной пагинации вместе с фильтрами."""
+        create_recipes(db_session, test_user, 3, title="Other")
+        matching_ids = create_recipes(db_session, test_user, 4, title="Soup", category=test_category)
+
+        first = client.get("/recipes/", params={"limit": 2, "category_id": test_category.id, "search": "Soup"})
+        second = client.get("/recipes/", params={
+            "limit": 2,
+            "category_id": test_category.id,
+            "search": "Soup",
+            "cursor": first.headers["X-Next-Cursor"],
+        })
+
+        ids = [recipe["id"] for recipe in first.json() + second.json()]
+        assert ids == sorted(matching_ids, reverse=True)
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_summary_by_author(self, client, db_session, test_user):
+        """Тест списка рецептов одного автора с курсором."""
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        db_session.add(other)
+        db_session.commit()
+        own_ids = create_recipes(db_session, test_user, 3)
+        create_recipes(db_session, other, 2)
+        author_id = test_user.id
+
+        first = client.get("/recipes/summary", params={"limit": 2, "author_id": author_id})
+        second = client.get("/recipes/summary", params={"limit": 2, "author_id": author_id, "cursor": first.headers["X-Next-Cursor"]})
+
+        ids = [recipe["id"] for recipe in first.json() + second.json()]
+        assert ids == sorted(own_ids, reverse=True)
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_large_limit_clamped(self, client, db_session, test_user):
+        """Тест: слишком большой limit ограничивается, а не отклоняется."""
+        create_recipes(db_session, test_user, 101)
+
+        response = client.get("/recipes/summary", params={"limit": 500})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 100
+        assert "X-Next-Cursor" in response.headers
+
+    def test_invalid_cursor_rejected(self, client):
+        """Тест запроса с некорректным курсором."""
+        response = client.get("/recipes/", params={"cursor": "garbage"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestRecipeDeleteAPI:
+    """Тесты для удаления рецепта."""
+
+    def test_delete_removes_related_rows(self, client, auth_headers, db_session, test_user, test_recipe, test_category):
+        """Тест: вместе с рецептом удаляются его комментарии, лайки и связи с категориями."""
+        recipe_id = test_recipe.id
+        test_recipe.categories.append(test_category)
+        db_session.add_all([
+            Comment(content="Вкусно", author_id=test_user.id, recipe_id=recipe_id),
+            Like(user_id=test_user.id, recipe_id=recipe_id),
+        ])
+        db_session.commit()
+
+        response = client.delete(f"/recipes/{recipe_id}", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        assert db_session.get(Recipe, recipe_id) is None
+        assert db_session.query(Comment).filter(Comment.recipe_id == recipe_id).count() == 0
+        assert db_session.query(Like).filter(Like.recipe_id == recipe_id).count() == 0
+        links = db_session.execute(text("SELECT COUNT(*) FROM recipe_categories WHERE recipe_id = :id"), {"id": recipe_id})
+        assert links.scalar() == 0
+
+
+class TestRecipeCountersAPI:
+    """Тесты для счетчиков лайков и комментариев."""
+
+    def test_like_toggle_updates_counter(self, client, auth_headers, test_recipe):
+        """Тест обновления счетчика лайков при переключении лайка."""
+        recipe_id = test_recipe.id
+        client.post(f"/recipes/{recipe_id}/like", headers=auth_headers)
+        assert client.get(f"/recipes/{recipe_id}").json()["likes_count"] == 1
+
+        client.post(f"/recipes/{recipe_id}/like", headers=auth_headers)
+        assert client.get(f"/recipes/{recipe_id}").json()["likes_count"] == 0
+
+    def test_like_endpoints_update_counter(self, client, auth_headers, test_recipe):
+        """Тест обновления счетчика через /likes."""
+        recipe_id = test_recipe.id
+        client.post(f"/likes/recipe/{recipe_id}/like", headers=auth_headers)
+        assert client.get(f"/likes/recipe/{recipe_id}/count").json()["likes_count"] == 1
+
+        client.delete(f"/likes/recipe/{recipe_id}/like", headers=auth_headers)
+        assert client.get(f"/likes/recipe/{recipe_id}/count").json()["likes_count"] == 0
+
+    def test_comments_update_counter(self, client, auth_headers, test_recipe):
+        """Тест обновления счетчика комментариев."""
+        recipe_id = test_recipe.id
+        response = client.post("/comments/", json={"content": "Вкусно", "recipe_id": recipe_id}, headers=auth_headers)
+        assert client.get(f"/recipes/{recipe_id}").json()["comments_count"] == 1
+
+        client.delete(f"/comments/{response.json()['id']}", headers=auth_headers)
+        assert client.get(f"/recipes/{recipe_id}").json()["comments_count"] == 0
+
+
+class TestRecipeCountersBusinessLogic:
+    """Тесты для пересчета счетчиков."""
+
+    def test_reconcile_counters(self, db_session, test_user, test_recipe):
+        """Тест пересчета счетчиков по таблицам лайков и комментариев."""
+        db_session.add(Like(user_id=test_user.id, recipe_id=test_recipe.id))
+        db_session.add(Comment(content="Test", author_id=test_user.id, recipe_id=test_recipe.id))
+        db_session.commit()
+
+        assert reconcile_counters(db_session) == 1
+        db_session.refresh(test_recipe)
+        assert test_recipe.likes_count == 1
+        assert test_recipe.comments_count == 1
+        assert reconcile_counters(db_session) == 0
+
+
+class TestRecipeSummaryAPI:
+    """Тесты для облегченного списка рецептов."""
+
+    def test_summary_fields(self, client, db_session, test_recipe, test_category):
+        """Тест полей карточки рецепта без ингредиентов и шагов."""
+        test_recipe.categories.append(test_category)
+        db_session.commit()
+        recipe_id, category_id = test_recipe.id, test_category.id
+
+        response = client.get("/recipes/summary")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["id"] == recipe_id
+        assert data[0]["author"]["email"] == "test@example.com"
+        assert [category["id"] for category in data[0]["categories"]] == [category_id]
+        assert "ingredients" not in data[0]
+        assert "steps" not in data[0]
+
+    def test_summary_filters_and_cursor(self, client, db_session, test_user, test_category):
+        """Тест фильтров и курсора в облегченном списке."""
+        create_recipes(db_session, test_user, 2, title="Other")
+        matching_ids = create_recipes(db_session, test_user, 3, title="Soup", category=test_category)
+
+        first = client.get("/recipes/summary", params={"limit": 2, "category_id": test_category.id})
+        second = client.get("/recipes/summary", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"], "category_id": test_category.id})
+
+        ids = [recipe["id"] for recipe in first.json() + second.json()]
+        assert ids == sorted(matching_ids, reverse=True)
+
+
+class TestRecipeSearchAPI:
+    """Тесты для полнотекстового поиска рецептов."""
+
+    def add_recipe(self, db_session, author, title, description="", ingredients=None):
+        recipe = Recipe(title=title, description=description, ingredients=ingredients or ["вода"], steps=["шаг"], author_id=author.id)
+        db_session.add(recipe)
+        db_session.commit()
+        return recipe.id
+
+    def test_cyrillic_case_insensitive(self, client, db_session, test_user):
+        """Тест поиска без учета регистра кириллицы."""
+        recipe_id = self.add_recipe(db_session, test_user, "Классический Борщ")
+
+        response = client.get("/recipes/", params={"search": "борщ"})
+
+        assert [recipe["id"] for recipe in response.json()] == [recipe_id]
+
+    def test_russian_stemming(self, client, db_session, test_user):
+        """Тест поиска по другим словоформам и ингредиентам."""
+        recipe_id = self.add_recipe(db_session, test_user, "Суп", ingredients=["2 картофелины", "куриное филе"])
+
+        response = client.get("/recipes/search", params={"q": "картофелина"})
+
+        assert [recipe["id"] for recipe in response.json()] == [recipe_id]
+
+    def test_ranking_prefers_title(self, client, db_session, test_user):
+        """Тест ранжирования: совпадение в названии важнее описания."""
+        in_description = self.add_recipe(db_session, test_user, "Ужин", description="Подается с гречкой")
+        in_title = self.add_recipe(db_session, test_user, "Гречка с грибами")
+
+        response = client.get("/recipes/search", params={"q": "гречка"})
+
+        assert [recipe["id"] for recipe in response.json()] == [in_title, in_description]
+
+    def test_index_follows_update_and_delete(self, client, db_session, test_user):
+        """Тест синхронизации индекса при изменении и удалении рецепта."""
+        recipe_id = self.add_recipe(db_session, test_user, "Блины")
+        recipe = db_session.get(Recipe, recipe_id)
+        recipe.title = "Оладьи"
+        db_session.commit()
+
+        assert client.get("/recipes/search", params={"q": "блины"}).json() == []
+        assert len(client.get("/recipes/search", params={"q": "оладьи"}).json()) == 1
+
+        db_session.delete(db_session.get(Recipe, recipe_id))
+        db_session.commit()
+
+        assert client.get("/recipes/search", params={"q": "оладьи"}).json() == []
+
+
+class TestRecipeETagAPI:
+    """Тесты для условных запросов (ETag / If-None-Match)."""
+
+    def test_recipe_not_modified(self, client, auth_headers, test_recipe):
+        """Тест ответа 304 для неизмененного рецепта и нового ETag после лайка."""
+        recipe_id = test_recipe.id
+        response = client.get(f"/recipes/{recipe_id}")
+        etag = response.headers["etag"]
+
+        cached = client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag})
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+
+        client.post(f"/recipes/{recipe_id}/like", headers=auth_headers)
+        response = client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert response.json()["likes_count"] == 1
+
+    def test_comments_not_modified(self, client, auth_headers, test_recipe):
+        """Тест ETag списка комментариев."""
+        recipe_id = test_recipe.id
+        etag = client.get(f"/recipes/{recipe_id}/comments").headers["etag"]
+        assert client.get(f"/recipes/{recipe_id}/comments", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post("/comments/", json={"content": "Вкусно", "recipe_id": recipe_id}, headers=auth_headers)
+        response = client.get(f"/recipes/{recipe_id}/comments", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+
+    def test_author_change_invalidates_etags(self, client, auth_headers, db_session, test_user, test_recipe):
+        """Тест: изменение автора меняет ETag рецепта и комментариев."""
+        recipe_id = test_recipe.id
+        client.post("/comments/", json={"content": "Вкусно", "recipe_id": recipe_id}, headers=auth_headers)
+        recipe_etag = client.get(f"/recipes/{recipe_id}").headers["etag"]
+        comments_etag = client.get(f"/recipes/{recipe_id}/comments").headers["etag"]
+
+        test_user.username = "renamed"
+        db_session.commit()
+
+        recipe = client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": recipe_etag})
+        comments = client.get(f"/recipes/{recipe_id}/comments", headers={"If-None-Match": comments_etag})
+        assert recipe.status_code == status.HTTP_200_OK
+        assert recipe.json()["author"]["username"] == "renamed"
+        assert comments.status_code == status.HTTP_200_OK
+        assert comments.json()[0]["author"]["username"] == "renamed"
+
+    def test_quick_edits_change_etags(self, client, auth_headers, test_recipe):
+        """Тест: две правки в пределах одной секунды дают разные ETag."""
+        recipe_id = test_recipe.id
+        form = {"title": "Щи", "description": "Суп", "ingredients": '["капуста"]', "steps": '["Варить"]'}
+        comment_id = client.post("/comments/", json={"content": "Вкусно", "recipe_id": recipe_id}, headers=auth_headers).json()["id"]
+        recipe_etags, comments_etags = [], []
+        for text_value in ("Первая правка", "Вторая правка"):
+            client.put(f"/recipes/{recipe_id}", data={**form, "description": text_value}, headers=auth_headers)
+            client.put(f"/comments/{comment_id}", json={"content": text_value}, headers=auth_headers)
+            recipe_etags.append(client.get(f"/recipes/{recipe_id}").headers["etag"])
+            comments_etags.append(client.get(f"/recipes/{recipe_id}/comments").headers["etag"])
+
+        assert recipe_etags[0] != recipe_etags[1]
+        assert comments_etags[0] != comments_etags[1]
+        response = client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": recipe_etags[0]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["description"] == "Вторая правка"
+
+    def test_missing_recipe_with_etag(self, client):
+        """Тест 404 для несуществующего рецепта даже с If-None-Match: *."""
+        response = client.get("/recipes/99999", headers={"If-None-Match": "*"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestRecipeJSONStorage:
+    """Тесты для хранения ингредиентов и шагов в JSON-колонках."""
+
+    def test_invalid_lists_rejected(self, client, auth_headers):
+        """Тест: ингредиенты и шаги должны быть JSON-списками строк."""
+        data = {"title": "Щи", "description": "Суп", "ingredients": '["капуста"]', "steps": '["Варить"]'}
+        for field, value in (("ingredients", '"соль"'), ("ingredients", '{"a": 1}'), ("steps", '[1, 2]'), ("steps", "не json")):
+            response = client.post("/recipes/", data={**data, field: value}, headers=auth_headers)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_stored_as_json(self, client, auth_headers, db_session):
+        """Тест: созданный через API рецепт хранит списки, доступные JSON-функциям БД."""
+        data = {"title": "Щи", "description": "Суп", "ingredients": '["капуста", "картофель"]', "steps": '["Варить"]'}
+        recipe_id = client.post("/recipes/", data=data, headers=auth_headers).json()["id"]
+
+        raw, first = db_session.execute(
+            text("SELECT ingredients, json_extract(ingredients, '$[0]') FROM recipes WHERE id = :id"),
+            {"id": recipe_id},
+        ).one()
+        assert raw == '["капуста","картофель"]'
+        assert first == "капуста"
+        assert db_session.get(Recipe, recipe_id).ingredients == ["капуста", "картофель"]
+
+
+class TestRecipeBatchAPI:
+    """Тесты для получения нескольких рецептов одним запросом."""
+
+    def test_batch_in_requested_order(self, client, db_session, test_user):
+        """Тест порядка рецептов и списка отсутствующих ID."""
+        first, second, third = create_recipes(db_session, test_user, 3)
+
+        response = client.get("/recipes/batch", params={"ids": f"{third},99999,{first}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [recipe["id"] for recipe in data["recipes"]] == [third, first]
+        assert data["missing"] == [99999]
+        assert data["recipes"][0]["ingredients"] == ["ingredient"]
+
+    def test_batch_repeated_parameter(self, client, db_session, test_user):
+        """Тест повторяющегося параметра ids и дубликатов."""
+        first, second = create_recipes(db_session, test_user, 2)
+
+        response = client.get("/recipes/batch", params={"ids": [second, first, second]})
+
+        assert [recipe["id"] for recipe in response.json()["recipes"]] == [second, first]
+
+    def test_batch_limits(self, client):
+        """Тест ограничения размера пакета и неверных ID."""
+        too_many = ",".join(str(i) for i in range(1, 102))
+        assert client.get("/recipes/batch", params={"ids": too_many}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get("/recipes/batch", params={"ids": "1,abc"}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,91 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import status
+from app.models import Recipe, Category
+from app.suggest import SuggestIndex, suggest_index, prefix_distance
+
+
+@pytest.fixture(autouse=True)
+def fresh_suggest_index():
+    """Сбрасывает индекс подсказок между тестами."""
+    suggest_index.reset()
+    yield
+    suggest_index.reset()
+
+
+class TestSuggestBusinessLogic:
+    """Тесты для индекса подсказок."""
+
+    def test_commit_during_load(self, db_session, test_user):
+        """Тест: рецепт, сохраненный во время первичной загрузки индекса, не теряется."""
+        class LateCommit:
+            """Сессия, в которую коммитят новый рецепт сразу после чтения снимка."""
+            committed = False
+
+            def query(self, *columns):
+                rows = db_session.query(*columns).all()
+                if not self.committed:
+                    self.committed = True
+                    db_session.add(Recipe(title="Пельмени", ingredients=["фарш"], steps=[], author_id=test_user.id))
+                    db_session.commit()
+                return SimpleNamespace(all=lambda: rows)
+
+        suggest_index.ensure_loaded(LateCommit())
+
+        assert [s["text"] for s in suggest_index.suggest("пельм")] == ["Пельмени"]
+
+    def test_prefix_distance(self):
+        """Тест расстояния редактирования до префикса."""
+        assert prefix_distance("борщ", "борщевик", 1) == 0
+        assert prefix_distance("бощр", "борщ", 1) == 1
+        assert prefix_distance("брш", "борщ", 1) == 2
+
+    def test_prefix_and_typos(self):
+        """Тест поиска по префиксу и с опечатками."""
+        index = SuggestIndex()
+        index.set_recipe(1, "Классический борщ", '["500г говядины", "2 свеклы"]')
+        index.set_category(1, "Супы")
+
+        assert [s["text"] for s in index.suggest("бор")] == ["Классический борщ"]
+        assert [s["text"] for s in index.suggest("класичес")] == ["Классический борщ"]
+        assert [s["text"] for s in index.suggest("говяд")] == ["говядины"]
+        assert index.suggest("суп") == [{"text": "Супы", "kind": "category", "id": 1}]
+
+    def test_incremental_update(self):
+        """Тест обновления и удаления рецепта без перестроения индекса."""
+        index = SuggestIndex()
+        index.set_recipe(1, "Блины", '["мука"]')
+        index.set_recipe(2, "Оладьи", '["мука"]')
+
+        index.set_recipe(1, "Сырники", '["творог"]')
+        assert index.suggest("блин") == []
+        assert [s["text"] for s in index.suggest("сырн")] == ["Сырники"]
+
+        index.remove_recipe(2)
+        assert index.suggest("мука") == []
+        assert index.suggest("твор") == [{"text": "творог", "kind": "ingredient", "id": None}]
+
+
+class TestSuggestAPI:
+    """Тесты для API подсказок."""
+
+    def test_suggest_loads_from_database(self, client, test_recipe, test_category):
+        """Тест подсказок по данным из базы."""
+        response = client.get("/search/suggest", params={"q": "test"})
+
+        assert response.status_code == status.HTTP_200_OK
+        kinds = {s["kind"] for s in response.json()}
+        assert kinds == {"recipe", "category"}
+
+    def test_suggest_follows_commits(self, client, db_session, test_user):
+        """Тест обновления подсказок после коммита и игнорирования отката."""
+        client.get("/search/suggest", params={"q": "x"})
+
+        db_session.add(Recipe(title="Пельмени", ingredients=["фарш"], steps=[], author_id=test_user.id))
+        db_session.commit()
+        db_session.add(Category(name="Пекарня"))
+        db_session.flush()
+        db_session.rollback()
+
+        texts = [s["text"] for s in client.get("/search/suggest", params={"q": "пе"}).json()]
+        assert texts == ["Пельмени"]
@@ -0,0 +1,35 @@
+import json
+from fastapi import status
+from app.models import Recipe
+from app.schemas import RecipeResponse
+from app.serialization import recipe_json, recipes_json
+
+
+class TestSerializationBusinessLogic:
+    """Тесты для быстрой сериализации рецептов."""
+
+    def test_matches_response_model(self, db_session, test_recipe):
+        """Тест совпадения результата с обычной сериализацией через модель ответа."""
+        expected = RecipeResponse.model_validate(test_recipe).model_dump(mode="json")
+
+        assert json.loads(recipe_json(test_recipe)) == expected
+        assert json.loads(recipes_json([test_recipe, test_recipe])) == [expected, expected]
+        assert expected["ingredients"] == ["ingredient1", "ingredient2"]
+
+
+class TestSerializationAPI:
+    """Тесты для ответов со списками рецептов."""
+
+    def test_list_keeps_cursor_header(self, client, db_session, test_user):
+        """Тест: быстрый ответ сохраняет заголовок курсора и текст без экранирования."""
+        for title in ("Щи", "Уха"):
+            db_session.add(Recipe(title=title, ingredients=["капуста"], steps=[], author_id=test_user.id))
+        db_session.commit()
+
+        response = client.get("/recipes/", params={"limit": 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        assert "X-Next-Cursor" in response.headers
+        assert "капуста".encode() in response.content
+        assert response.json()[0]["ingredients"] == ["капуста"]
@@ -48,8 +48,8 @@ class TestSimpleBusinessLogic:
         recipe = Recipe(
             title="Test Recipe",
             description="Test Description",
-            ingredients='["ingredient1", "ingredient2"]',
-            steps='["step1", "step2"]',
+            ingredients=["ingredient1", "ingredient2"],
+            steps=["step1", "step2"],
             author_id=test_user.id
         )
         recipe.categories.append(test_category)
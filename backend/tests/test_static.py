@@ -0,0 +1,83 @@
+import gzip
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from app.static import UploadFiles, accepted_encodings, parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def uploads_client(tmp_path):
+    """Клиент для приложения, раздающего файлы из временного каталога."""
+    (tmp_path / "photo.png").write_bytes(CONTENT)
+    (tmp_path / "photo.png.gz").write_bytes(gzip.compress(CONTENT))
+    app = Starlette(routes=[Mount("/uploads", UploadFiles(directory=tmp_path, precompressed=True))])
+    return TestClient(app)
+
+
+class TestStaticBusinessLogic:
+    """Тесты для разбора заголовков Range и Accept-Encoding."""
+
+    def test_parse_range(self):
+        """Тест разбора диапазонов байтов."""
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=900-", 1000) == (900, 999)
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+        assert parse_range("bytes=500-5000", 1000) == (500, 999)
+        assert parse_range("bytes=0-1,5-6", 1000) is None
+        assert parse_range("items=0-1", 1000) is None
+        assert parse_range(None, 1000) is None
+        with pytest.raises(ValueError):
+            parse_range("bytes=1000-", 1000)
+
+    def test_accepted_encodings(self):
+        """Тест разбора Accept-Encoding с весами."""
+        assert accepted_encodings("gzip, br;q=0.5, deflate;q=0") == {"gzip", "br"}
+        assert accepted_encodings(None) == set()
+
+
+class TestStaticAPI:
+    """Тесты для раздачи загруженных файлов."""
+
+    def test_immutable_headers(self, uploads_client):
+        """Тест заголовков долговременного кэширования и строгого ETag."""
+        response = uploads_client.get("/uploads/photo.png", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == CONTENT
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert not response.headers["etag"].startswith("W/")
+
+        repeat = uploads_client.get(
+            "/uploads/photo.png",
+            headers={"Accept-Encoding": "identity", "If-None-Match": response.headers["etag"]},
+        )
+        assert repeat.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_range_request(self, uploads_client):
+        """Тест частичной выдачи файла."""
+        headers = {"Accept-Encoding": "identity"}
+        response = uploads_client.get("/uploads/photo.png", headers={**headers, "Range": "bytes=10-19"})
+
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+        stale = uploads_client.get("/uploads/photo.png", headers={**headers, "Range": "bytes=10-19", "If-Range": '"old"'})
+        assert stale.status_code == status.HTTP_200_OK
+
+        beyond = uploads_client.get("/uploads/photo.png", headers={**headers, "Range": "bytes=5000-"})
+        assert beyond.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+    def test_precompressed_variant(self, uploads_client):
+        """Тест выдачи предварительно сжатой копии клиенту, который ее принимает."""
+        response = uploads_client.get("/uploads/photo.png", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == CONTENT
@@ -0,0 +1,78 @@
+import os
+import time
+from fastapi import status
+from app.config import settings
+from app.models import Recipe
+from app.uploads import collect_garbage, reference_counts
+from tests.test_images import RECIPE_FORM, image_bytes, upload_dir  # noqa: F401
+
+
+def upload(client, auth_headers, content, recipe_id=None):
+    """Создает или редактирует рецепт с изображением и возвращает ответ."""
+    files = {"image": ("photo.png", content, "image/png")}
+    if recipe_id is None:
+        return client.post("/recipes/", data=RECIPE_FORM, files=files, headers=auth_headers)
+    return client.put(f"/recipes/{recipe_id}", data=RECIPE_FORM, files=files, headers=auth_headers)
+
+
+def age(path, seconds=2 * 3600):
+    """Делает файл старше периода ожидания сборщика мусора."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestUploadStorageAPI:
+    """Тесты для хранения загрузок по хешу содержимого."""
+
+    def test_same_image_stored_once(self, client, auth_headers, upload_dir):
+        """Тест: повторная загрузка того же файла не создает копию."""
+        content = image_bytes()
+        first = upload(client, auth_headers, content).json()
+        second = upload(client, auth_headers, content).json()
+
+        assert first["image_url"] == second["image_url"]
+        originals = [path for path in upload_dir.iterdir() if "_" not in path.name]
+        assert len(originals) == 1
+
+    def test_replaced_image_removed(self, client, auth_headers, upload_dir):
+        """Тест удаления старого изображения при замене, если оно больше не используется."""
+        recipe = upload(client, auth_headers, image_bytes(size=(10, 10))).json()
+        old_file = upload_dir / recipe["image_url"].rsplit("/", 1)[1]
+        age(old_file)
+
+        upload(client, auth_headers, image_bytes(size=(20, 20)), recipe_id=recipe["id"])
+
+        assert not old_file.exists()
+        assert not list(upload_dir.glob(old_file.stem + "_*"))
+
+    def test_shared_image_kept_until_last_recipe_deleted(self, client, auth_headers, upload_dir):
+        """Тест: файл, используемый несколькими рецептами, удаляется вместе с последним."""
+        content = image_bytes()
+        first = upload(client, auth_headers, content).json()
+        second = upload(client, auth_headers, content).json()
+        shared = upload_dir / first["image_url"].rsplit("/", 1)[1]
+        age(shared)
+
+        client.delete(f"/recipes/{first['id']}", headers=auth_headers)
+        assert shared.exists()
+
+        response = client.delete(f"/recipes/{second['id']}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert not shared.exists()
+
+
+class TestUploadGarbageCollector:
+    """Тесты для сборщика неиспользуемых загрузок."""
+
+    def test_collect_garbage(self, db_session, test_user, upload_dir):
+        """Тест удаления только старых файлов без ссылок."""
+        for name in ("used.png", "orphan.png", "fresh.png", "orphan_card.webp", ".crashed.part"):
+            (upload_dir / name).write_bytes(b"data")
+        for name in ("used.png", "orphan.png", "orphan_card.webp", ".crashed.part"):
+            age(upload_dir / name)
+        db_session.add(Recipe(title="Суп", ingredients=[], steps=[], image_url="/uploads/used.png", author_id=test_user.id))
+        db_session.commit()
+
+        assert reference_counts(db_session) == {"used.png": 1}
+        assert collect_garbage(db_session) == 2
+        assert sorted(path.name for path in upload_dir.iterdir()) == ["fresh.png", "used.png"]
@@ -1,8 +1,9 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
 import { Clock, Users, Heart, MessageCircle, User } from 'lucide-react';
+import RecipeImage from './RecipeImage';
 
-const RecipeCard = ({ recipe }) => {
+const RecipeCard = ({ recipe, liked = false }) => {
   const totalTime = (recipe.prep_time || 0) + (recipe.cook_time || 0);
   
   const formatTime = (minutes) => {
@@ -48,9 +49,9 @@ const RecipeCard = ({ recipe }) => {
                 {/* Image */}
                 <div className="aspect-w-16 aspect-h-9 bg-gray-200 dark:bg-gray-700">
                   {recipe.image_url ? (
-                    <img
-                      src={recipe.image_url.startsWith('http') ? recipe.image_url : `http://localhost:8000${recipe.image_url}`}
-                      alt={recipe.title}
+                    <RecipeImage
+                      recipe={recipe}
+                      variant="card"
                       className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-200"
                     />
                   ) : (
@@ -124,7 +125,7 @@ const RecipeCard = ({ recipe }) => {
             </div>
             <div className="flex items-center space-x-3">
               <div className="flex items-center space-x-1">
-                <Heart className="h-4 w-4 text-red-500" />
+                <Heart className={`h-4 w-4 text-red-500 ${liked ? 'fill-current' : ''}`} />
                 <span className="text-sm text-gray-600 dark:text-gray-300">
                   {recipe.likes_count || 0}
                 </span>
@@ -0,0 +1,29 @@
+import React, { useState } from 'react';
+
+const toAbsolute = (url) => (url.startsWith('http') ? url : `http://localhost:8000${url}`);
+
+// Картинка рецепта в нужном размере: WebP с запасным JPEG.
+// Пока уменьшенные копии не готовы (сразу после загрузки), показывается оригинал.
+const RecipeImage = ({ recipe, variant = 'card', className, alt }) => {
+  const [useOriginal, setUseOriginal] = useState(false);
+  const urls = recipe.image_variants && recipe.image_variants[variant];
+
+  if (!urls || useOriginal) {
+    return <img src={toAbsolute(recipe.image_url)} alt={alt || recipe.title} className={className} loading="lazy" />;
+  }
+
+  return (
+    <picture>
+      <source srcSet={toAbsolute(urls.webp)} type="image/webp" />
+      <img
+        src={toAbsolute(urls.jpeg)}
+        alt={alt || recipe.title}
+        className={className}
+        loading="lazy"
+        onError={() => setUseOriginal(true)}
+      />
+    </picture>
+  );
+};
+
+export default RecipeImage;
@@ -9,11 +9,20 @@ const FavoritesPage = () => {
   const { user, isAuthenticated } = useAuth();
   const [favoriteRecipes, setFavoriteRecipes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
 
-  console.log('FavoritesPage component rendered, user:', user);
+  // Избранное хранится на сервере (таблица лайков) и отдается страницами по курсору
+  const fetchFavorites = async (cursor = null) => {
+    const params = new URLSearchParams({ limit: '12' });
+    if (cursor) params.append('cursor', cursor);
+    const response = await api.get(`/users/me/likes?${params}`);
+    setNextCursor(response.headers['x-next-cursor'] || null);
+    return Array.isArray(response.data) ? response.data : [];
+  };
 
   useEffect(() => {
-    const fetchFavoriteRecipes = async () => {
+    const loadFirstPage = async () => {
       if (!isAuthenticated) {
         setLoading(false);
         return;
@@ -21,27 +30,9 @@ const FavoritesPage = () => {
       
       try {
         setLoading(true);
-        console.log('❤️ Fetching favorite recipes for user:', user.id);
-        
-        // Получаем все рецепты и фильтруем по лайкам
-        console.log('🌐 Making API request to /recipes');
-        const response = await api.get('/recipes');
-        console.log('✅ All recipes API response:', response.data);
-        
-        // API возвращает массив напрямую
-        const allRecipes = Array.isArray(response.data) ? response.data : [];
-        console.log('📋 All recipes:', allRecipes);
-        
-        // Получаем избранные рецепты из localStorage
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        const favorites = allRecipes.filter(recipe => likedRecipes.includes(recipe.id));
-        console.log('❤️ Favorite recipes:', favorites);
-        console.log('📊 Favorite recipes count:', favorites.length);
-        
-        setFavoriteRecipes(favorites);
+        setFavoriteRecipes(await fetchFavorites());
       } catch (error) {
-        console.error('❌ Error fetching favorite recipes:', error);
-        console.error('❌ Error details:', error.response?.data || error.message);
+        console.error('Error fetching favorite recipes:', error.response?.data || error.message);
         setFavoriteRecipes([]);
         toast.error('Ошибка загрузки избранных рецептов');
       } finally {
@@ -49,18 +40,26 @@ const FavoritesPage = () => {
       }
     };
 
-    fetchFavoriteRecipes();
+    loadFirstPage();
   }, [isAuthenticated, user]);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const recipes = await fetchFavorites(nextCursor);
+      setFavoriteRecipes(prev => [...prev, ...recipes]);
+    } catch (error) {
+      console.error('Error fetching favorite recipes:', error.response?.data || error.message);
+      toast.error('Ошибка загрузки избранных рецептов');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleRemoveFromFavorites = async (recipeId) => {
     try {
       await api.delete(`/recipes/${recipeId}/like`);
       
-      // Обновляем localStorage
-      const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-      const updatedLikedRecipes = likedRecipes.filter(id => id !== recipeId);
-      localStorage.setItem('likedRecipes', JSON.stringify(updatedLikedRecipes));
-      
       setFavoriteRecipes(prev => prev.filter(recipe => recipe.id !== recipeId));
       toast.success('Рецепт убран из избранного');
     } catch (error) {
@@ -118,7 +117,7 @@ const FavoritesPage = () => {
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {favoriteRecipes.map(recipe => (
               <div key={recipe.id} className="relative">
-                <RecipeCard recipe={recipe} />
+                <RecipeCard recipe={recipe} liked />
                 <button
                   onClick={() => handleRemoveFromFavorites(recipe.id)}
                   className="absolute top-2 right-2 bg-red-500 text-white p-2 rounded-full hover:bg-red-600 transition-colors duration-200"
@@ -129,6 +128,18 @@ const FavoritesPage = () => {
               </div>
             ))}
           </div>
+
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-primary-600 text-white rounded-md hover:bg-primary-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors duration-200"
+              >
+                {loadingMore ? 'Загрузка...' : 'Загрузить еще'}
+              </button>
+            </div>
+          )}
         </>
       )}
     </div>
@@ -1,16 +1,21 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import api from '../config/api';
+import { useAuth } from '../context/AuthContext';
 import RecipeCard from '../components/RecipeCard';
 import { Search, Filter, Loader } from 'lucide-react';
 
 const HomePage = () => {
+  const { isAuthenticated } = useAuth();
   const [recipes, setRecipes] = useState([]);
+  const [likedIds, setLikedIds] = useState(new Set());
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('');
   const [categories, setCategories] = useState([]);
   const [page, setPage] = useState(1);
   const [hasMore, setHasMore] = useState(true);
+  const nextCursor = useRef(null);
+  const checkedIds = useRef(new Set());
 
   console.log('HomePage component rendered');
 
@@ -78,14 +83,16 @@ const HomePage = () => {
         console.log('Current page:', page, 'searchTerm:', searchTerm, 'selectedCategory:', selectedCategory);
         
         const params = new URLSearchParams({
-          page: page.toString(),
           limit: '10'
         });
         
+        // Следующая страница запрашивается по курсору из заголовка X-Next-Cursor
+        if (page > 1 && nextCursor.current) params.append('cursor', nextCursor.current);
+        
         if (searchTerm) params.append('search', searchTerm);
         if (selectedCategory) params.append('category_id', selectedCategory);
         
-        const url = `/recipes?${params}`;
+        const url = `/recipes/summary?${params}`;
         console.log('Requesting URL:', url);
         
         const response = await api.get(url);
@@ -109,8 +116,9 @@ const HomePage = () => {
           });
         }
         
-        setHasMore(response.data.has_more || false);
-        console.log('Has more:', response.data.has_more || false);
+        nextCursor.current = response.headers['x-next-cursor'] || null;
+        setHasMore(Boolean(nextCursor.current));
+        console.log('Has more:', Boolean(nextCursor.current));
       } catch (error) {
         console.error('Error fetching recipes:', error);
         // Fallback to empty array if API fails
@@ -124,6 +132,24 @@ const HomePage = () => {
     fetchRecipes();
   }, [page, searchTerm, selectedCategory]);
 
+  // Статус лайков для загруженных карточек: только для еще не проверенных, до 100 за запрос
+  const recipeIds = recipes.map(recipe => recipe.id).join(',');
+  useEffect(() => {
+    if (!isAuthenticated) {
+      checkedIds.current = new Set();
+      setLikedIds(new Set());
+      return;
+    }
+
+    const ids = recipeIds ? recipeIds.split(',').filter(id => !checkedIds.current.has(id)) : [];
+    ids.forEach(id => checkedIds.current.add(id));
+    for (let i = 0; i < ids.length; i += 100) {
+      api.get(`/likes/status?ids=${ids.slice(i, i + 100).join(',')}`)
+        .then(({ data }) => setLikedIds(prev => new Set([...prev, ...data.liked])))
+        .catch(error => console.error('Error fetching like status:', error));
+    }
+  }, [recipeIds, isAuthenticated]);
+
   const handleSearch = (e) => {
     setSearchTerm(e.target.value);
     setPage(1);
@@ -211,7 +237,7 @@ const HomePage = () => {
           {/* Recipes Grid */}
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {recipes.map(recipe => (
-              <RecipeCard key={recipe.id} recipe={recipe} />
+              <RecipeCard key={recipe.id} recipe={recipe} liked={likedIds.has(recipe.id)} />
             ))}
           </div>
 
@@ -1,56 +1,36 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../context/AuthContext';
 import api from '../config/api';
 import { Link } from 'react-router-dom';
 import { User, Mail, Calendar, Plus, Edit, Trash2 } from 'lucide-react';
 import toast from 'react-hot-toast';
+import RecipeImage from '../components/RecipeImage';
 
 const ProfilePage = () => {
   const { user } = useAuth();
   const [userRecipes, setUserRecipes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
 
-  console.log('ProfilePage component rendered, user:', user);
+  // Рецепты автора запрашиваются страницами по курсору из заголовка X-Next-Cursor
+  const fetchUserRecipes = useCallback(async (cursor = null) => {
+    const params = new URLSearchParams({ author_id: String(user.id), limit: '12' });
+    if (cursor) params.append('cursor', cursor);
+    const response = await api.get(`/recipes/summary?${params}`);
+    setNextCursor(response.headers['x-next-cursor'] || null);
+    return Array.isArray(response.data) ? response.data : [];
+  }, [user]);
 
   useEffect(() => {
-    const fetchUserRecipes = async () => {
-      if (!user) return;
-      
+    if (!user) return;
+
+    const loadFirstPage = async () => {
       try {
         setLoading(true);
-        console.log('👤 Fetching user recipes for user:', user.id);
-        
-        // Получаем все рецепты и фильтруем по автору
-        console.log('🌐 Making API request to /recipes');
-        
-        // Тест с fetch через proxy
-        try {
-          const fetchResponse = await fetch('/recipes');
-          const fetchData = await fetchResponse.json();
-          console.log('✅ Fetch test successful:', fetchData);
-        } catch (fetchError) {
-          console.error('❌ Fetch test failed:', fetchError);
-        }
-        
-        const response = await api.get('/recipes');
-        console.log('✅ All recipes API response:', response.data);
-        console.log('📊 Response data type:', typeof response.data);
-        console.log('📊 Response is array:', Array.isArray(response.data));
-        
-        // API возвращает массив напрямую, а не объект с полем recipes
-        const allRecipes = Array.isArray(response.data) ? response.data : (response.data.recipes || []);
-        console.log('📋 All recipes:', allRecipes);
-        
-        // Фильтруем рецепты по автору
-        const userRecipes = allRecipes.filter(recipe => recipe.author_id === user.id);
-        console.log('👤 Filtered user recipes:', userRecipes);
-        console.log('📊 User recipes count:', userRecipes.length);
-        
-        setUserRecipes(userRecipes);
+        setUserRecipes(await fetchUserRecipes());
       } catch (error) {
-        console.error('❌ Error fetching user recipes:', error);
-        console.error('❌ Error details:', error.response?.data || error.message);
-        // Fallback to empty array if API fails
+        console.error('Error fetching user recipes:', error.response?.data || error.message);
         setUserRecipes([]);
         toast.error('Ошибка загрузки рецептов');
       } finally {
@@ -58,8 +38,21 @@ const ProfilePage = () => {
       }
     };
 
-    fetchUserRecipes();
-  }, [user]);
+    loadFirstPage();
+  }, [user, fetchUserRecipes]);
+
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const recipes = await fetchUserRecipes(nextCursor);
+      setUserRecipes(prev => [...prev, ...recipes]);
+    } catch (error) {
+      console.error('Error fetching user recipes:', error.response?.data || error.message);
+      toast.error('Ошибка загрузки рецептов');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const handleDeleteRecipe = async (recipeId) => {
     if (!window.confirm('Вы уверены, что хотите удалить этот рецепт?')) {
@@ -124,7 +117,7 @@ const ProfilePage = () => {
       <div className="bg-white dark:bg-gray-800 rounded-lg shadow-md p-6">
         <div className="flex items-center justify-between mb-6">
           <h2 className="text-2xl font-bold text-gray-900 dark:text-white">
-            Мои рецепты ({userRecipes.length})
+            Мои рецепты ({userRecipes.length}{nextCursor ? '+' : ''})
           </h2>
           <Link
             to="/app/add-recipe"
@@ -158,9 +151,9 @@ const ProfilePage = () => {
               <div key={recipe.id} className="bg-gray-50 dark:bg-gray-700 rounded-lg overflow-hidden">
                 {recipe.image_url && (
                   <div className="aspect-w-16 aspect-h-9">
-                    <img
-                      src={`http://localhost:8000${recipe.image_url}`}
-                      alt={recipe.title}
+                    <RecipeImage
+                      recipe={recipe}
+                      variant="card"
                       className="w-full h-32 object-cover"
                     />
                   </div>
@@ -212,6 +205,18 @@ const ProfilePage = () => {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="text-center mt-6">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-primary-600 text-white rounded-md hover:bg-primary-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors duration-200"
+            >
+              {loadingMore ? 'Загрузка...' : 'Загрузить еще'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
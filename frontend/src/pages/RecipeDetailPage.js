@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import api from '../config/api';
 import { useAuth } from '../context/AuthContext';
 import toast from 'react-hot-toast';
+import RecipeImage from '../components/RecipeImage';
 import { 
   Clock, 
   Users, 
@@ -48,10 +49,6 @@ const RecipeDetailPage = () => {
         setRecipe(recipe);
         setComments(comments);
         setLikesCount(recipe.likes_count || 0);
-        
-        // Проверяем, лайкнут ли рецепт пользователем (используем localStorage)
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        setIsLiked(likedRecipes.includes(parseInt(id)));
       } catch (error) {
         console.error('Error fetching recipe data:', error);
         toast.error('Ошибка загрузки рецепта');
@@ -63,6 +60,18 @@ const RecipeDetailPage = () => {
     fetchRecipeData();
   }, [id]);
 
+  // Лайк хранится на сервере, поэтому сердечко одинаково на всех устройствах
+  useEffect(() => {
+    if (!isAuthenticated) {
+      setIsLiked(false);
+      return;
+    }
+
+    api.get(`/recipes/${id}/is-liked`)
+      .then(({ data }) => setIsLiked(data.is_liked))
+      .catch(error => console.error('Error fetching like status:', error));
+  }, [id, isAuthenticated]);
+
   const handleLike = async () => {
     if (!isAuthenticated) {
       toast.error('Войдите в аккаунт, чтобы поставить лайк');
@@ -70,60 +79,14 @@ const RecipeDetailPage = () => {
     }
 
     try {
-      if (isLiked) {
-        // Убираем лайк
-        await api.delete(`/recipes/${id}/like`);
-        setIsLiked(false);
-        setLikesCount(prev => prev - 1);
-        
-        // Обновляем localStorage
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        const updatedLikedRecipes = likedRecipes.filter(recipeId => recipeId !== parseInt(id));
-        localStorage.setItem('likedRecipes', JSON.stringify(updatedLikedRecipes));
-        
-        toast.success('Лайк убран');
-      } else {
-        // Ставим лайк
-        await api.post(`/recipes/${id}/like`);
-        setIsLiked(true);
-        setLikesCount(prev => prev + 1);
-        
-        // Обновляем localStorage
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        if (!likedRecipes.includes(parseInt(id))) {
-          likedRecipes.push(parseInt(id));
-          localStorage.setItem('likedRecipes', JSON.stringify(likedRecipes));
-        }
-        
-        toast.success('Лайк поставлен');
-      }
+      // POST переключает лайк и возвращает новое состояние
+      const { data } = await api.post(`/recipes/${id}/like`);
+      setIsLiked(data.liked);
+      setLikesCount(prev => prev + (data.liked ? 1 : -1));
+      toast.success(data.liked ? 'Лайк поставлен' : 'Лайк убран');
     } catch (error) {
       console.error('Like error:', error.response?.data);
-      if (error.response?.data?.detail === 'Recipe already liked') {
-        // Если рецепт уже лайкнут, просто обновляем состояние
-        setIsLiked(true);
-        
-        // Обновляем localStorage
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        if (!likedRecipes.includes(parseInt(id))) {
-          likedRecipes.push(parseInt(id));
-          localStorage.setItem('likedRecipes', JSON.stringify(likedRecipes));
-        }
-        
-        toast.success('Рецепт уже в избранном');
-      } else if (error.response?.data?.detail === 'Recipe not liked') {
-        // Если рецепт не лайкнут, просто обновляем состояние
-        setIsLiked(false);
-        
-        // Обновляем localStorage
-        const likedRecipes = JSON.parse(localStorage.getItem('likedRecipes') || '[]');
-        const updatedLikedRecipes = likedRecipes.filter(recipeId => recipeId !== parseInt(id));
-        localStorage.setItem('likedRecipes', JSON.stringify(updatedLikedRecipes));
-        
-        toast.success('Рецепт убран из избранного');
-      } else {
-        toast.error('Ошибка при постановке лайка');
-      }
+      toast.error('Ошибка при постановке лайка');
     }
   };
 
@@ -186,9 +149,9 @@ const RecipeDetailPage = () => {
               <div className="bg-white dark:bg-gray-800 rounded-lg shadow-md overflow-hidden">
                 {recipe.image_url ? (
                   <div className="aspect-w-16 aspect-h-9">
-                    <img
-                      src={recipe.image_url.startsWith('http') ? recipe.image_url : `http://localhost:8000${recipe.image_url}`}
-                      alt={recipe.title}
+                    <RecipeImage
+                      recipe={recipe}
+                      variant="full"
                       className="w-full h-64 md:h-96 object-cover"
                     />
                   </div>